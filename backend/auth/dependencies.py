@@ -0,0 +1,350 @@
+"""
+Shared authentication dependencies for Nautilink API routers.
+"""
+from fastapi import HTTPException, Depends, Request, status
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from cachetools import TTLCache
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import httpx
+import hashlib
+import logging
+import time
+import jwt
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+security = HTTPBearer()
+
+# Routes served without a bearer token; the auth middleware skips these
+PUBLIC_PATHS = {"/", "/health"}
+PUBLIC_PATH_PREFIXES = (
+    "/auth/signup",
+    "/auth/login",
+    "/auth/refresh",
+    "/auth/forgot-password",
+    "/auth/reset-password",
+    "/api/",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+)
+
+# Shared HTTP client for Supabase auth calls, preconfigured with the project
+# URL and anon key. Reusing one client keeps connections (and their TLS
+# sessions) alive across requests; it is closed from the application lifespan
+# in main.py.
+HTTP_CLIENT = httpx.AsyncClient(
+    base_url=settings.SUPABASE_URL,
+    headers={"apikey": settings.SUPABASE_ANON_KEY},
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+)
+
+# Verified users keyed by a hash of their access token, so repeat callers skip
+# the Supabase round-trip. Entries also carry the token's own expiry so a
+# cached user never outlives the JWT it was verified from.
+USER_CACHE_TTL_SECONDS = 60
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+
+# The in-flight Supabase verification for each token, so a burst of requests
+# carrying the same new token makes a single upstream call and shares its
+# result. Entries are removed as soon as the call finishes.
+_verify_inflight: Dict[str, asyncio.Task] = {}
+
+# Tokens Supabase recently rejected or throttled, keyed like `_user_cache` and
+# holding (retry_until, consecutive_failures). While a token is in here it is
+# refused without another call, so bursts don't amplify upstream 429s.
+REJECTED_TOKEN_MAX_BACKOFF_SECONDS = 60
+_rejected_tokens: TTLCache = TTLCache(
+    maxsize=10_000, ttl=REJECTED_TOKEN_MAX_BACKOFF_SECONDS
+)
+
+
+# Projects using Supabase's asymmetric signing keys publish the public keys
+# here; they are fetched once and refreshed every few minutes, so those
+# tokens can also be verified without a round-trip per user.
+JWKS_PATH = "/auth/v1/.well-known/jwks.json"
+JWKS_CACHE_TTL_SECONDS = 600
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+_jwks: Optional[Tuple[float, Dict[str, Any]]] = None
+_jwks_lock = asyncio.Lock()
+
+
+def _token_cache_key(token: str) -> str:
+    """Hash the bearer token so raw credentials are never held in memory as keys."""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _cached_user(cache_key: str) -> Optional[dict]:
+    """Return the cached user for a token hash, dropping it if the token expired."""
+    cached = _user_cache.get(cache_key)
+    if cached is None:
+        return None
+    user_dict, expires_at = cached
+    if expires_at > time.time():
+        return user_dict
+    _user_cache.pop(cache_key, None)
+    return None
+
+
+def _token_expiry(token: str) -> float:
+    """
+    Read the `exp` claim without verifying the signature (it was verified already).
+    Falls back to the cache TTL if the claim is missing or unreadable.
+    """
+    now = time.time()
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+        exp = float(claims.get("exp", now + USER_CACHE_TTL_SECONDS))
+    except Exception:
+        exp = now + USER_CACHE_TTL_SECONDS
+    return min(now + USER_CACHE_TTL_SECONDS, exp)
+
+
+def _reject_token(cache_key: str, retry_after: Optional[str]) -> None:
+    """
+    Remember a rejected token until Supabase's Retry-After, or with exponential
+    backoff (1s, 2s, 4s, ... capped) when no usable header was sent.
+    """
+    _, failures = _rejected_tokens.get(cache_key, (0.0, 0))
+    failures += 1
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = 2 ** (failures - 1)
+    delay = min(max(delay, 0.0), REJECTED_TOKEN_MAX_BACKOFF_SECONDS)
+    _rejected_tokens[cache_key] = (time.time() + delay, failures)
+
+
+async def _signing_keys() -> Dict[str, Any]:
+    """Public signing keys from the project's JWKS, keyed by `kid`."""
+    global _jwks
+    if _jwks is not None and _jwks[0] > time.time():
+        return _jwks[1]
+    async with _jwks_lock:
+        # Another request may have refreshed the keys while we waited
+        if _jwks is not None and _jwks[0] > time.time():
+            return _jwks[1]
+        response = await HTTP_CLIENT.get(JWKS_PATH)
+        response.raise_for_status()
+        try:
+            jwk_set = jwt.PyJWKSet.from_dict(response.json())
+            keys = {jwk.key_id: jwk.key for jwk in jwk_set.keys if jwk.key_id}
+        except jwt.PyJWKSetError:
+            # Symmetric-only projects publish an empty key set
+            keys = {}
+        _jwks = (time.time() + JWKS_CACHE_TTL_SECONDS, keys)
+        return keys
+
+
+async def _local_verification_key(token: str) -> Optional[Tuple[Any, str]]:
+    """
+    Pick the key and algorithm to verify a token locally: the project's JWT
+    secret for HS256 tokens, or the matching JWKS key for asymmetric ones.
+    Returns None when neither is available and Supabase must be asked.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        if settings.SUPABASE_JWT_SECRET:
+            return settings.SUPABASE_JWT_SECRET, algorithm
+        return None
+    
+    kid = header.get("kid")
+    if algorithm in ASYMMETRIC_ALGORITHMS and kid:
+        key = (await _signing_keys()).get(kid)
+        if key is not None:
+            return key, algorithm
+    return None
+
+
+def _decode_supabase_jwt(token: str, key: Any, algorithm: str) -> dict:
+    """
+    Verify a Supabase access token locally against the given key.
+    Avoids a network round-trip to Supabase for every authenticated request.
+    """
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience="authenticated",
+        )
+    except jwt.InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    
+    if not claims.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    
+    # Tokens do not carry account timestamps; keep the keys for a stable shape
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email", ""),
+        "created_at": None,
+        "updated_at": None,
+        "user_metadata": claims.get("user_metadata", {}),
+        "app_metadata": claims.get("app_metadata", {}),
+    }
+
+
+async def _fetch_supabase_user(token: str, cache_key: str) -> dict:
+    """
+    Verify a token by asking Supabase's user endpoint.
+    Used when the token cannot be verified locally.
+    """
+    rejected = _rejected_tokens.get(cache_key)
+    if rejected is not None and rejected[0] > time.time():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    
+    response = await HTTP_CLIENT.get(
+        "/auth/v1/user",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    
+    if response.status_code != 200:
+        # 5xx is Supabase's problem, not the token's; only back off on 4xx
+        if response.status_code < 500:
+            _reject_token(cache_key, response.headers.get("Retry-After"))
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    
+    _rejected_tokens.pop(cache_key, None)
+    user_data = response.json()
+    
+    if not user_data or "id" not in user_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    
+    # Supabase's user object already carries id, email, timestamps and
+    # metadata; callers read it with .get(), so return it as-is
+    return user_data
+
+
+async def _fetch_and_cache_user(token: str, cache_key: str) -> dict:
+    """Verify a token with Supabase and cache the user on success."""
+    user_dict = await _fetch_supabase_user(token, cache_key)
+    _user_cache[cache_key] = (user_dict, _token_expiry(token))
+    return user_dict
+
+
+def _finish_verification(cache_key: str, task: asyncio.Task) -> None:
+    """Drop a finished verification and mark its exception as retrieved."""
+    if _verify_inflight.get(cache_key) is task:
+        del _verify_inflight[cache_key]
+    if not task.cancelled():
+        task.exception()
+
+
+async def verify_token(token: str) -> dict:
+    """
+    Verify an access token and return the user dict, using the token cache.
+    Verifies locally with SUPABASE_JWT_SECRET (HS256) or the project's JWKS
+    (asymmetric keys), otherwise with a direct HTTP request to Supabase's
+    user endpoint.
+    """
+    try:
+        cache_key = _token_cache_key(token)
+        
+        user_dict = _cached_user(cache_key)
+        if user_dict is not None:
+            return user_dict
+        
+        local_key = await _local_verification_key(token)
+        if local_key is not None:
+            user_dict = _decode_supabase_jwt(token, *local_key)
+            _user_cache[cache_key] = (user_dict, _token_expiry(token))
+            return user_dict
+        
+        # Another request may have verified this token while we looked up keys
+        user_dict = _cached_user(cache_key)
+        if user_dict is not None:
+            return user_dict
+        
+        task = _verify_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(_fetch_and_cache_user(token, cache_key))
+            _verify_inflight[cache_key] = task
+            task.add_done_callback(lambda t: _finish_verification(cache_key, t))
+        # Shielded so one cancelled request doesn't cancel the call for the rest
+        return await asyncio.shield(task)
+    
+    except HTTPException:
+        raise
+    except httpx.HTTPError as e:
+        # Network or HTTP errors
+        logger.warning("HTTP error during auth: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not verify authentication credentials",
+        )
+    except Exception:
+        # Log the details server-side only; they don't belong in the response
+        logger.exception("Auth error")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+
+
+def _is_public_path(path: str) -> bool:
+    """Whether a request path is served without authentication."""
+    return path in PUBLIC_PATHS or path.startswith(PUBLIC_PATH_PREFIXES)
+
+
+async def authenticate_request(request: Request, call_next):
+    """
+    HTTP middleware that verifies the bearer token once per request and stores
+    the user on `request.state.user`. Invalid tokens are rejected with 401
+    before the route reads or validates the request body.
+    """
+    if not _is_public_path(request.url.path):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                request.state.user = await verify_token(token)
+            except HTTPException as e:
+                return ORJSONResponse(
+                    status_code=e.status_code,
+                    content={"detail": e.detail},
+                )
+    return await call_next(request)
+
+
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict:
+    """
+    Dependency to get the current authenticated user from the JWT token.
+    Returns the user already verified by `authenticate_request`, falling back
+    to verifying the token here if the middleware did not run.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    return await verify_token(credentials.credentials)
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import Client
-from typing import Optional
 
+from auth.dependencies import get_current_user
 from auth.models import (
     UserSignup,
     UserLogin,
@@ -17,54 +16,15 @@ from config import settings
 from supabase import create_client
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
-security = HTTPBearer()
 
-# Initialize Supabase client for auth operations
+# Initialize Supabase client for auth operations. Its calls are blocking, so
+# the handlers using it are plain `def` and FastAPI runs them in its
+# threadpool instead of stalling the event loop.
 supabase_auth: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """
-    Dependency to get the current authenticated user from the JWT token.
-    """
-    try:
-        token = credentials.credentials
-        # Create a temporary client and set the authorization header
-        # The Supabase Python client's get_user() verifies the token
-        temp_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-        # Set the session using the access token
-        # Note: set_session requires both access_token and refresh_token
-        # For token verification, we'll use the token directly in the headers
-        temp_client.postgrest.auth(token)
-        user_response = temp_client.auth.get_user()
-        
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-            )
-        user = user_response.user
-        # Convert user to dict format
-        user_dict = {
-            "id": user.id,
-            "email": user.email or "",
-            "created_at": user.created_at,
-            "updated_at": user.updated_at,
-            "user_metadata": user.user_metadata or {},
-            "app_metadata": getattr(user, "app_metadata", {}),
-        }
-        return user_dict
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {str(e)}",
-        )
-
-
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserSignup):
+def signup(user_data: UserSignup):
     """
     Register a new user.
     """
@@ -126,7 +86,7 @@ async def signup(user_data: UserSignup):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
+def login(credentials: UserLogin):
     """
     Authenticate a user and return access tokens.
     """
@@ -173,7 +133,7 @@ async def login(credentials: UserLogin):
 
 
 @router.post("/logout")
-async def logout(current_user: dict = Depends(get_current_user)):
+def logout(current_user: dict = Depends(get_current_user)):
     """
     Logout the current user (revoke the session).
     """
@@ -192,18 +152,22 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """
     Get the current authenticated user's information.
     """
-    return UserResponse(
-        id=current_user.get("id"),
-        email=current_user.get("email", ""),
-        full_name=current_user.get("user_metadata", {}).get("full_name"),
-        created_at=current_user.get("created_at"),
-        updated_at=current_user.get("updated_at"),
-        metadata=current_user.get("user_metadata"),
-    )
+    # current_user is the dict the auth middleware already stored on
+    # request.state; return a plain dict and let response_model validate it
+    # once instead of building a UserResponse here as well
+    user_metadata = current_user.get("user_metadata") or {}
+    return {
+        "id": current_user.get("id"),
+        "email": current_user.get("email", ""),
+        "full_name": user_metadata.get("full_name"),
+        "created_at": current_user.get("created_at"),
+        "updated_at": current_user.get("updated_at"),
+        "metadata": current_user.get("user_metadata"),
+    }
 
 
 @router.put("/me", response_model=UserResponse)
-async def update_user_profile(
+def update_user_profile(
     user_update: UserUpdate,
     current_user: dict = Depends(get_current_user),
 ):
@@ -248,7 +212,7 @@ async def update_user_profile(
 
 
 @router.post("/refresh")
-async def refresh_token(refresh_token: str):
+def refresh_token(refresh_token: str):
     """
     Refresh the access token using a refresh token.
     """
@@ -284,7 +248,7 @@ async def refresh_token(refresh_token: str):
 
 
 @router.post("/forgot-password")
-async def forgot_password(request: PasswordResetRequest):
+def forgot_password(request: PasswordResetRequest):
     """
     Send a password reset email to the user.
     """
@@ -304,7 +268,7 @@ async def forgot_password(request: PasswordResetRequest):
 
 
 @router.post("/reset-password")
-async def reset_password(confirm: PasswordResetConfirm):
+def reset_password(confirm: PasswordResetConfirm):
     """
     Reset password using the token from the reset email.
     Note: This endpoint requires the user to be authenticated with the reset token.
@@ -336,7 +300,7 @@ async def reset_password(confirm: PasswordResetConfirm):
 
 
 @router.post("/change-password")
-async def change_password(
+def change_password(
     password_update: PasswordUpdate,
     current_user: dict = Depends(get_current_user),
 ):
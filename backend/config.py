@@ -8,7 +8,13 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
+    SUPABASE_JWT_SECRET: Optional[str] = None
     PROGRAM_ID: Optional[str] = None
+    # Pre-fund authority wallets for /web3/transfer-ownership in the background.
+    # Off by default: each pooled wallet costs a devnet faucet airdrop, and the
+    # faucet is rate limited
+    FUNDED_KEYPAIR_POOL_ENABLED: bool = False
+    FUNDED_KEYPAIR_POOL_SIZE: int = 4
     
     class Config:
         env_file = ".env"
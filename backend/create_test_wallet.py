@@ -6,7 +6,8 @@ Then move it to the backend directory.
 
 OR if you have a different wallet file path, specify it.
 """
-import json
+import os
+import orjson
 import sys
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
@@ -14,14 +15,15 @@ from solders.pubkey import Pubkey
 def import_wallet_from_file(wallet_path):
     """Import wallet from Solana CLI format"""
     try:
-        with open(wallet_path, 'r') as f:
-            keypair_data = json.load(f)
+        with open(wallet_path, 'rb') as f:
+            wallet_json = f.read()
         
-        keypair = Keypair.from_bytes(bytes(keypair_data))
+        keypair = Keypair.from_bytes(bytes(orjson.loads(wallet_json)))
         
-        # Save to test_wallet.json
-        with open('test_wallet.json', 'w') as f:
-            json.dump(keypair_data, f)
+        # Save to test_wallet.json; the contents were validated above, so
+        # copy them through as-is (Solana CLI format) instead of re-encoding
+        with open('test_wallet.json', 'wb') as f:
+            f.write(wallet_json)
         
         print("Wallet imported successfully!")
         print(f"Address: {keypair.pubkey()}")
@@ -37,8 +39,8 @@ def check_if_matches_expected():
     expected = "4oi4ZELW4QG6ntpeAcMMX676TNJiZJB7b44wjZ6L6duZ"
     
     try:
-        with open('test_wallet.json', 'r') as f:
-            keypair_data = json.load(f)
+        with open('test_wallet.json', 'rb') as f:
+            keypair_data = orjson.loads(f.read())
         keypair = Keypair.from_bytes(bytes(keypair_data))
         
         if str(keypair.pubkey()) == expected:
@@ -65,7 +67,6 @@ if __name__ == "__main__":
         import_wallet_from_file(wallet_path)
     else:
         # Check if test_wallet.json already exists
-        import os
         if os.path.exists('test_wallet.json'):
             print("\nFound existing test_wallet.json")
             check_if_matches_expected()
@@ -1,13 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import create_client, Client
-from config import settings
+from fastapi.responses import ORJSONResponse
+from auth.dependencies import HTTP_CLIENT, authenticate_request
 from auth.router import router as auth_router
 from api.router import router as api_router
 from posts.router import router as posts_router
+from posts.keypair_pool import start_keypair_pool, stop_keypair_pool
+from posts.solana_simple import close_rpc_client
 from monitoring.router import router as monitoring_router
 
-app = FastAPI(title="Nautilink API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep crate keypairs (and, if enabled, pre-funded authority keypairs)
+    # ready for the /web3 transaction builders
+    start_keypair_pool()
+    yield
+    await stop_keypair_pool()
+    # Close shared outbound connections on shutdown
+    await HTTP_CLIENT.aclose()
+    await close_rpc_client()
+
+
+app = FastAPI(
+    title="Nautilink API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Authenticate bearer tokens once per request (registered before CORS so
+# that CORS stays outermost and 401 responses still carry CORS headers)
+app.middleware("http")(authenticate_request)
 
 # CORS middleware
 app.add_middleware(
@@ -18,9 +43,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-
 # Include routers
 app.include_router(auth_router)
 app.include_router(api_router)
@@ -40,5 +62,14 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # uvloop and httptools ship with uvicorn[standard]; name them explicitly so
+    # a missing install fails loudly instead of falling back to asyncio/h11
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        loop="uvloop",
+        http="httptools",
+    )
 
@@ -6,12 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-import asyncio
-
-from config import settings
-from supabase import create_client, Client
-import jwt
 
+from auth.dependencies import get_current_user
 from services.xai_service import get_xai_service
 
 
@@ -22,43 +18,9 @@ class SummarizeRequest(BaseModel):
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-
-
-async def get_current_user(authorization: str = None) -> dict:
-    """Get current user from JWT token."""
-    if not authorization or not authorization.startswith('Bearer '):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid authorization header"
-        )
-    
-    token = authorization.split(' ')[1]
-    
-    try:
-        # Verify JWT token with Supabase
-        response = supabase.auth.get_user(token)
-        if response.user:
-            return {
-                "id": response.user.id,
-                "email": response.user.email,
-                "user_metadata": response.user.user_metadata or {}
-            }
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {str(e)}"
-        )
-
 
 @router.get("/status")
-async def get_monitoring_status(authorization: str = Depends(get_current_user)):
+async def get_monitoring_status(current_user: dict = Depends(get_current_user)):
     """
     Get overall system monitoring status.
     Includes fleet metrics, transaction stats, and AI-powered summary.
@@ -101,7 +63,7 @@ async def get_monitoring_status(authorization: str = Depends(get_current_user)):
 
 
 @router.get("/fleet-analysis")
-async def get_fleet_analysis(authorization: str = Depends(get_current_user)):
+async def get_fleet_analysis(current_user: dict = Depends(get_current_user)):
     """
     Get AI-powered fleet activity analysis.
     Uses xAI (Grok) to analyze vessel behavior and provide insights.
@@ -129,7 +91,7 @@ async def get_fleet_analysis(authorization: str = Depends(get_current_user)):
 
 
 @router.get("/anomalies")
-async def detect_anomalies(authorization: str = Depends(get_current_user)):
+async def detect_anomalies(current_user: dict = Depends(get_current_user)):
     """
     Detect anomalies in vessel activity using AI.
     Identifies suspicious patterns, compliance issues, and potential IUU fishing.
@@ -153,7 +115,7 @@ async def detect_anomalies(authorization: str = Depends(get_current_user)):
 
 
 @router.get("/compliance-report")
-async def get_compliance_report(authorization: str = Depends(get_current_user)):
+async def get_compliance_report(current_user: dict = Depends(get_current_user)):
     """
     Generate AI-powered compliance report.
     """
@@ -178,7 +140,7 @@ async def get_compliance_report(authorization: str = Depends(get_current_user)):
 
 
 @router.get("/risk-prediction")
-async def predict_risks(authorization: str = Depends(get_current_user)):
+async def predict_risks(current_user: dict = Depends(get_current_user)):
     """
     Predict potential risks using AI analysis of historical patterns.
     """
@@ -203,7 +165,7 @@ async def predict_risks(authorization: str = Depends(get_current_user)):
 @router.get("/live-feed")
 async def get_live_feed(
     limit: int = 50,
-    authorization: str = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     Get live activity feed with real-time events.
@@ -226,7 +188,7 @@ async def get_live_feed(
 @router.get("/alerts")
 async def get_alerts(
     severity: str = None,
-    authorization: str = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     Get active alerts and warnings.
@@ -375,7 +337,7 @@ async def _fetch_live_events(limit: int) -> List[Dict[str, Any]]:
 @router.post("/summarize")
 async def summarize_content(
     request: SummarizeRequest,
-    authorization: str = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     Summarize content using xAI (Grok).
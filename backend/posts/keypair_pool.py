@@ -0,0 +1,186 @@
+"""
+Pools of pre-generated keypairs for transaction building.
+
+Generating and airdropping a fresh authority wallet takes several RPC
+round-trips (seconds on devnet). A background task keeps a queue of funded
+keypairs warm so `transfer_ownership` can take one without waiting.
+
+Every built transaction also needs a new crate record keypair. A second
+task keeps those pre-generated off the event loop, so the Ed25519 key
+derivation stays out of request handling.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import List, Optional
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+
+from config import settings
+from posts.solana_simple import SOLANA_RPC_URL, confirm_signature, get_rpc_client
+
+KEYPAIR_BATCH_SIZE = 8
+AIRDROP_LAMPORTS = 2_000_000_000  # 2 SOL
+# Backoff after a batch whose airdrops all failed: doubles per consecutive
+# failed batch up to the cap, plus jitter so restarts don't retry in lockstep
+AIRDROP_RETRY_SECONDS = 5.0
+AIRDROP_MAX_BACKOFF_SECONDS = 120.0
+AIRDROP_BACKOFF_JITTER_SECONDS = 1.0
+
+CRATE_KEYPAIR_POOL_SIZE = 64
+# Unused crate keypairs older than this are dropped rather than handed out
+CRATE_KEYPAIR_MAX_AGE_SECONDS = 600.0
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[asyncio.Queue] = None
+_replenish_task: Optional[asyncio.Task] = None
+# Free places in _pool. The refill task reserves one before each airdrop and
+# take_funded_keypair() hands one back, so no airdrop runs while the pool is
+# full
+_pool_slots: Optional[asyncio.Semaphore] = None
+
+# Holds (created_at, Keypair) pairs, created_at from time.monotonic()
+_crate_pool: Optional[asyncio.Queue] = None
+_crate_replenish_task: Optional[asyncio.Task] = None
+
+
+def airdrops_available() -> bool:
+    """Airdrops only work on devnet/testnet."""
+    return "devnet" in SOLANA_RPC_URL or "testnet" in SOLANA_RPC_URL
+
+
+async def fund_keypair(client: AsyncClient, keypair: Keypair) -> bool:
+    """
+    Airdrop SOL to a keypair and wait for confirmation.
+    Returns False if the airdrop failed (the wallet may already have funds).
+    """
+    try:
+        airdrop_sig = await client.request_airdrop(keypair.pubkey(), AIRDROP_LAMPORTS)
+        await confirm_signature(airdrop_sig.value)
+        return True
+    except Exception as e:
+        logger.warning("Airdrop failed (may already have funds): %s", e)
+        return False
+
+
+def _generate_keypairs(count: int) -> List[Keypair]:
+    """Generate a batch of keypairs; run in an executor to keep the event loop free."""
+    return [Keypair() for _ in range(count)]
+
+
+async def _reserve_pool_slots(max_count: int) -> int:
+    """Wait for at least one free place in the pool and reserve up to max_count."""
+    await _pool_slots.acquire()
+    count = 1
+    while count < max_count and not _pool_slots.locked():
+        # Doesn't block: a place is free
+        await _pool_slots.acquire()
+        count += 1
+    return count
+
+
+async def _replenish_keypair_pool() -> None:
+    """
+    Keep the pool topped up with funded keypairs; blocks while it is full.
+    Refills in batches: keypairs are generated off the event loop and their
+    airdrops run concurrently, so a batch costs about one airdrop round-trip.
+    """
+    loop = asyncio.get_running_loop()
+    client = get_rpc_client()
+    failed_batches = 0
+    while True:
+        # Reserve places before airdropping, so no faucet request is spent on
+        # a keypair the full pool can't take
+        batch_size = await _reserve_pool_slots(KEYPAIR_BATCH_SIZE)
+        keypairs = await loop.run_in_executor(None, _generate_keypairs, batch_size)
+        
+        # Only keypairs whose airdrop succeeded go in: callers treat anything
+        # taken from the pool as funded and skip funding it themselves
+        funded = await asyncio.gather(*(fund_keypair(client, kp) for kp in keypairs))
+        keypairs = [kp for kp, ok in zip(keypairs, funded) if ok]
+        for _ in range(batch_size - len(keypairs)):
+            _pool_slots.release()
+        if not keypairs:
+            # Airdrops are rate limited; back off instead of spinning
+            delay = min(AIRDROP_MAX_BACKOFF_SECONDS, AIRDROP_RETRY_SECONDS * 2 ** failed_batches)
+            # Stop counting once the cap is reached
+            failed_batches = min(failed_batches + 1, 8)
+            await asyncio.sleep(delay + random.uniform(0, AIRDROP_BACKOFF_JITTER_SECONDS))
+            continue
+        failed_batches = 0
+        
+        for keypair in keypairs:
+            _pool.put_nowait(keypair)
+
+
+async def _replenish_crate_keypair_pool() -> None:
+    """Keep the crate keypair pool topped up; blocks while it is full."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch_size = min(KEYPAIR_BATCH_SIZE, max(1, _crate_pool.maxsize - _crate_pool.qsize()))
+        keypairs = await loop.run_in_executor(None, _generate_keypairs, batch_size)
+        created_at = time.monotonic()
+        for keypair in keypairs:
+            await _crate_pool.put((created_at, keypair))
+
+
+def start_keypair_pool() -> None:
+    """
+    Start the background tasks that fill the pools. Called from the app lifespan.
+    The funded pool only runs when FUNDED_KEYPAIR_POOL_ENABLED is set and
+    airdrops work; otherwise take_funded_keypair() returns None and callers
+    fund their own wallet.
+    """
+    global _pool, _pool_slots, _replenish_task, _crate_pool, _crate_replenish_task
+    if _crate_replenish_task is not None:
+        return
+    if settings.FUNDED_KEYPAIR_POOL_ENABLED and airdrops_available():
+        _pool = asyncio.Queue(maxsize=settings.FUNDED_KEYPAIR_POOL_SIZE)
+        _pool_slots = asyncio.Semaphore(settings.FUNDED_KEYPAIR_POOL_SIZE)
+        _replenish_task = asyncio.create_task(_replenish_keypair_pool())
+    _crate_pool = asyncio.Queue(maxsize=CRATE_KEYPAIR_POOL_SIZE)
+    _crate_replenish_task = asyncio.create_task(_replenish_crate_keypair_pool())
+
+
+async def stop_keypair_pool() -> None:
+    """Cancel the background tasks. Called from the app lifespan on shutdown."""
+    global _replenish_task, _crate_replenish_task
+    for task in (_replenish_task, _crate_replenish_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _replenish_task = None
+    _crate_replenish_task = None
+
+
+def take_funded_keypair() -> Optional[Keypair]:
+    """Take a funded keypair from the pool, or None if the pool is empty."""
+    if _pool is None:
+        return None
+    try:
+        keypair = _pool.get_nowait()
+    except asyncio.QueueEmpty:
+        return None
+    _pool_slots.release()
+    return keypair
+
+
+def take_crate_keypair() -> Keypair:
+    """
+    Take a fresh crate record keypair from the pool, generating one inline if
+    the pool is empty or only holds keypairs past their max age.
+    """
+    while _crate_pool is not None:
+        try:
+            created_at, keypair = _crate_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        if time.monotonic() - created_at < CRATE_KEYPAIR_MAX_AGE_SECONDS:
+            return keypair
+    return Keypair()
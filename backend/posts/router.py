@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import ORJSONResponse
 from supabase import Client
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Tuple, Union
 from collections import deque
-from pydantic import BaseModel, Field
-from datetime import datetime
-import httpx
+from pydantic import Base64Bytes, BaseModel, ConfigDict, Field
+import asyncio
 import base64
+import functools
+import time
 import uuid
 import io
+import logging
 
 # Optional PIL import for image processing
 try:
@@ -18,32 +20,46 @@ except ImportError:
     PIL_AVAILABLE = False
     Image = None
 
+from auth.dependencies import get_current_user
 from config import settings
-from supabase import create_client
+from services.supabase_client import get_supabase_client
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey as PublicKey
 from posts.solana_simple import (
+    build_create_crate_batch_transaction,
     build_create_crate_transaction,
     build_transfer_ownership_transaction,
+    build_transfer_ownership_raw,
+    confirm_signature,
+    get_rpc_client,
+    MAX_WEIGHT,
     PROGRAM_ID,
     SOLANA_RPC_URL
 )
 # Keep load_program from the old module for legacy endpoints
 from posts.solana import load_program
+from posts.keypair_pool import (
+    airdrops_available,
+    fund_keypair,
+    take_crate_keypair,
+    take_funded_keypair,
+)
 
 router = APIRouter(prefix="/web3", tags=["web3"])
-security = HTTPBearer()
 
-# Initialize Supabase client for auth operations
-supabase_auth: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+logger = logging.getLogger(__name__)
 
-# Initialize Supabase client for database/storage operations
+# Shared Supabase client for database/storage operations
 # Use anon key for now (service role key is optional)
-supabase_db: Client = create_client(
-    settings.SUPABASE_URL,
-    settings.SUPABASE_ANON_KEY
-)
+supabase_db: Client = get_supabase_client()
 
+# Base58-encoded Solana public key. Checked by pydantic-core's regex engine so
+# malformed keys are rejected before any transaction building.
+SOLANA_PUBKEY_PATTERN = r"^[1-9A-HJ-NP-Za-km-z]{32,44}$"
 
 # Pydantic models for request/response
+# Request models are strict (no type coercion) and frozen, which lets
+# pydantic-core skip its lax conversion paths when validating bodies
 class CreateCrateRequest(BaseModel):
     """Request model for creating a new crate."""
     crate_id: str = Field(..., description="Unique crate identifier", min_length=1)
@@ -51,16 +67,18 @@ class CreateCrateRequest(BaseModel):
     owner_did: str = Field(..., description="Decentralized Identifier (DID) for the owner", min_length=1)
     device_did: str = Field(..., description="Decentralized Identifier (DID) for the NFC/scanner device", min_length=1)
     location: str = Field(..., description="Location as lat,long string", min_length=1)
-    weight: int = Field(..., description="Weight in grams", gt=0)
+    weight: int = Field(..., description="Weight in grams", gt=0, le=MAX_WEIGHT)
     ipfs_cid: str = Field(..., description="IPFS content ID for metadata", min_length=1)
     hash: str = Field(..., description="SHA256 hash of crate data", min_length=1)
     timestamp: Optional[int] = Field(None, description="Unix timestamp (defaults to now)")
-    solana_wallet: Optional[str] = Field(None, description="User's Solana wallet public key")
+    solana_wallet: Optional[str] = Field(None, description="User's Solana wallet public key", pattern=SOLANA_PUBKEY_PATTERN)
     image: Optional[str] = Field(None, description="Optional base64 encoded image to store off-chain")
     supply_chain_stage: Optional[str] = Field(None, description="Supply chain stage (e.g., fisher, fishery, processor, distributor, retailer)")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        strict=True,
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "crate_id": "CRATE_001",
                 "crate_did": "did:nautilink:crate:001",
@@ -73,7 +91,8 @@ class CreateCrateRequest(BaseModel):
                 "timestamp": 1234567890,
                 "solana_wallet": "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM"
             }
-        }
+        },
+    )
 
 
 class CreateCrateResponse(BaseModel):
@@ -83,15 +102,15 @@ class CreateCrateResponse(BaseModel):
     crate_id: str
     user_id: str
     validated: bool = Field(..., description="Whether JWT token was successfully verified")
-    transaction: Optional[str] = Field(None, description="Base64 encoded unsigned transaction")
+    transaction: Optional[Base64Bytes] = Field(None, description="Base64 encoded unsigned transaction")
     crate_pubkey: Optional[str] = Field(None, description="Public key of the crate account")
-    crate_keypair: Optional[str] = Field(None, description="Base64 encoded keypair for signing")
-    accounts: Optional[dict] = Field(None, description="Account addresses for the transaction")
+    crate_keypair: Optional[Base64Bytes] = Field(None, description="Base64 encoded keypair for signing")
+    accounts: Optional[Dict[str, str]] = Field(None, description="Account addresses for the transaction")
     image_url: Optional[str] = Field(None, description="URL of uploaded image if provided")
     offchain_stored: bool = Field(False, description="Whether crate data was stored off-chain")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "message": "Crate creation transaction built successfully",
@@ -107,25 +126,58 @@ class CreateCrateResponse(BaseModel):
                     "system_program": "11111111111111111111111111111111"
                 }
             }
-        }
+        },
+    )
+
+
+# Most crates one batch request may create
+MAX_BATCH_CRATES = 32
+
+
+class CreateCrateBatchRequest(BaseModel):
+    """Request model for creating several crates with one authority."""
+    crates: List[CreateCrateRequest] = Field(..., description="Crates to create", min_length=1, max_length=MAX_BATCH_CRATES)
+    solana_wallet: Optional[str] = Field(None, description="User's Solana wallet public key", pattern=SOLANA_PUBKEY_PATTERN)
+    timestamp: Optional[int] = Field(None, description="Unix timestamp for crates without their own (defaults to now)")
+    
+    model_config = ConfigDict(strict=True, frozen=True)
+
+
+class CrateBatchTransaction(BaseModel):
+    """One unsigned transaction of a crate batch and the crates it creates."""
+    transaction: Base64Bytes = Field(..., description="Base64 encoded unsigned transaction")
+    crate_pubkeys: List[str] = Field(..., description="Public keys of the crate accounts it creates")
+    crate_keypairs: List[Base64Bytes] = Field(..., description="Base64 encoded crate keypairs that must co-sign it")
+
+
+class CreateCrateBatchResponse(BaseModel):
+    """Response model for the batch create crate endpoint."""
+    success: bool
+    message: str
+    user_id: str
+    validated: bool = Field(..., description="Whether JWT token was successfully verified")
+    transactions: List[CrateBatchTransaction] = Field(..., description="Unsigned transactions, each signed by the authority and its crate keypairs")
+    offchain_stored: bool = Field(False, description="Whether every crate's data was stored off-chain")
 
 
 class TransferOwnershipRequest(BaseModel):
     """Request model for transferring crate ownership."""
-    parent_crate_pubkey: str = Field(..., description="Public key of the parent crate being transferred", min_length=32)
+    parent_crate_pubkey: str = Field(..., description="Public key of the parent crate being transferred", pattern=SOLANA_PUBKEY_PATTERN)
     crate_id: str = Field(..., description="Unique identifier for the new crate record", min_length=1)
     crate_did: str = Field(..., description="Decentralized Identifier (DID) for the crate", min_length=1)
     owner_did: str = Field(..., description="Decentralized Identifier (DID) for the new owner", min_length=1)
     device_did: str = Field(..., description="Decentralized Identifier (DID) for the NFC/scanner device", min_length=1)
     location: str = Field(..., description="Location as lat,long string", min_length=1)
-    weight: int = Field(..., description="Weight in grams (must match parent crate)", gt=0)
+    weight: int = Field(..., description="Weight in grams (must match parent crate)", gt=0, le=MAX_WEIGHT)
     hash: str = Field(..., description="SHA256 hash of crate data", min_length=1)
     ipfs_cid: str = Field(..., description="IPFS content ID for metadata", min_length=1)
     timestamp: Optional[int] = Field(None, description="Unix timestamp (defaults to now)")
-    solana_wallet: Optional[str] = Field(None, description="New owner's Solana wallet public key")
+    solana_wallet: Optional[str] = Field(None, description="New owner's Solana wallet public key", pattern=SOLANA_PUBKEY_PATTERN)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        strict=True,
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "parent_crate_pubkey": "DtHLdSPxNwFw31JK8AYNiJx8r1YkQYcTw11qmH99HKYp",
                 "crate_id": "CRATE_002",
@@ -139,7 +191,8 @@ class TransferOwnershipRequest(BaseModel):
                 "timestamp": 1234567890,
                 "solana_wallet": "6ZTB7UovQqYZmE37uRuBjQoPtvZHx2Par4rhD7mp8ge4"
             }
-        }
+        },
+    )
 
 
 class TransferOwnershipResponse(BaseModel):
@@ -149,14 +202,14 @@ class TransferOwnershipResponse(BaseModel):
     crate_id: str
     user_id: str
     validated: bool = Field(..., description="Whether JWT token was successfully verified")
-    transaction: Optional[str] = Field(None, description="Base64 encoded unsigned transaction")
+    transaction: Optional[Base64Bytes] = Field(None, description="Base64 encoded unsigned transaction")
     crate_pubkey: Optional[str] = Field(None, description="Public key of the new crate account")
-    crate_keypair: Optional[str] = Field(None, description="Base64 encoded keypair for signing")
+    crate_keypair: Optional[Base64Bytes] = Field(None, description="Base64 encoded keypair for signing")
     parent_crate: Optional[str] = Field(None, description="Public key of the parent crate")
-    accounts: Optional[dict] = Field(None, description="Account addresses for the transaction")
+    accounts: Optional[Dict[str, str]] = Field(None, description="Account addresses for the transaction")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "message": "Transfer ownership transaction built successfully",
@@ -174,7 +227,8 @@ class TransferOwnershipResponse(BaseModel):
                     "system_program": "11111111111111111111111111111111"
                 }
             }
-        }
+        },
+    )
 
 
 class TransferOwnershipOnChainResponse(BaseModel):
@@ -187,10 +241,10 @@ class TransferOwnershipOnChainResponse(BaseModel):
     parent_crate: str = Field(..., description="Public key of the parent crate")
     transaction_signature: str = Field(..., description="Solana transaction signature (proof of on-chain submission)")
     explorer_url: str = Field(..., description="Solana explorer URL to view transaction")
-    accounts: dict = Field(..., description="Account addresses involved in the transaction")
+    accounts: Dict[str, str] = Field(..., description="Account addresses involved in the transaction")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "message": "Transfer ownership completed and recorded on Solana blockchain",
@@ -206,7 +260,8 @@ class TransferOwnershipOnChainResponse(BaseModel):
                     "parent_crate": "DtHLdSPxNwFw31JK8AYNiJx8r1YkQYcTw11qmH99HKYp"
                 }
             }
-        }
+        },
+    )
 
 
 class CrateNode(BaseModel):
@@ -255,70 +310,6 @@ class CrateHistoryResponse(BaseModel):
     is_root: bool = Field(..., description="Whether this is a root crate")
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """
-    Dependency to get the current authenticated user from the JWT token.
-    Verifies the token with Supabase by making a direct HTTP request to the user endpoint.
-    """
-    try:
-        token = credentials.credentials
-        
-        # Make a direct HTTP request to Supabase's user endpoint to verify the token
-        # This is more reliable than using the Python client's get_user() method
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.SUPABASE_URL}/auth/v1/user",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "apikey": settings.SUPABASE_ANON_KEY,
-                },
-                timeout=10.0,
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid authentication credentials",
-                )
-            
-            user_data = response.json()
-            
-            if not user_data or "id" not in user_data:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid authentication credentials",
-                )
-            
-            # Convert to dict format matching the expected structure
-            user_dict = {
-                "id": user_data.get("id"),
-                "email": user_data.get("email", ""),
-                "created_at": user_data.get("created_at"),
-                "updated_at": user_data.get("updated_at"),
-                "user_metadata": user_data.get("user_metadata", {}),
-                "app_metadata": user_data.get("app_metadata", {}),
-            }
-            return user_dict
-            
-    except HTTPException:
-        raise
-    except httpx.HTTPError as e:
-        # Network or HTTP errors
-        print(f"HTTP error during auth: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not verify authentication credentials",
-        )
-    except Exception as e:
-        # Log the actual error for debugging
-        error_msg = str(e)
-        print(f"Auth error: {error_msg}")  # Debug log
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {error_msg}",
-        )
-
-
 async def upload_image_to_supabase(image_base64: str, crate_pubkey: str) -> Optional[str]:
     """
     Upload a base64 encoded image to Supabase Storage.
@@ -340,7 +331,7 @@ async def upload_image_to_supabase(image_base64: str, crate_pubkey: str) -> Opti
         
         # Validate it's actually an image by trying to open it
         if not PIL_AVAILABLE:
-            print("Warning: PIL/Pillow not available, skipping image validation")
+            logger.warning("PIL/Pillow not available, skipping image validation")
             # Still try to upload without validation
             ext = "jpg"  # Default extension
         else:
@@ -363,7 +354,7 @@ async def upload_image_to_supabase(image_base64: str, crate_pubkey: str) -> Opti
                 }
                 ext = format_map.get(img.format, 'jpg')
             except Exception as img_error:
-                print(f"Invalid image data: {str(img_error)}")
+                logger.error("Invalid image data: %s", img_error)
                 return None
             
             # Generate unique filename
@@ -389,7 +380,7 @@ async def upload_image_to_supabase(image_base64: str, crate_pubkey: str) -> Opti
             if response and hasattr(response, 'path'):
                 # Get public URL - construct it manually or use get_public_url
                 public_url = f"{settings.SUPABASE_URL}/storage/v1/object/public/crate-images/{file_path}"
-                print(f"✓ Image uploaded successfully: {public_url}")
+                logger.debug("Image uploaded successfully: %s", public_url)
                 return public_url
             elif response:
                 # Try to get public URL using the client method
@@ -397,21 +388,19 @@ async def upload_image_to_supabase(image_base64: str, crate_pubkey: str) -> Opti
                     public_url_response = supabase_db.storage.from_("crate-images").get_public_url(file_path)
                     if public_url_response:
                         public_url = public_url_response if isinstance(public_url_response, str) else str(public_url_response)
-                        print(f"✓ Image uploaded successfully: {public_url}")
+                        logger.debug("Image uploaded successfully: %s", public_url)
                         return public_url
                 except Exception as url_error:
                     # Fallback to manual URL construction
                     public_url = f"{settings.SUPABASE_URL}/storage/v1/object/public/crate-images/{file_path}"
-                    print(f"✓ Image uploaded (using fallback URL): {public_url}")
+                    logger.debug("Image uploaded (using fallback URL): %s", public_url)
                     return public_url
             else:
-                print("Failed to upload image: No response from Supabase")
+                logger.error("Failed to upload image: No response from Supabase")
                 return None
             
     except Exception as e:
-        print(f"Error uploading image to Supabase: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error uploading image to Supabase: %s", e)
         return None
 
 
@@ -480,16 +469,14 @@ async def store_crate_offchain(
         response = supabase_db.table("crates").insert(crate_data).execute()
         
         if response.data:
-            print(f"✓ Crate stored off-chain: {crate_id} ({crate_pubkey[:8]}...)")
+            logger.debug("Crate stored off-chain: %s (%s...)", crate_id, crate_pubkey[:8])
             return True
         else:
-            print(f"Failed to store crate off-chain: {response}")
+            logger.error("Failed to store crate off-chain: %s", response)
             return False
             
     except Exception as e:
-        print(f"Error storing crate off-chain: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error storing crate off-chain: %s", e)
         return False
 
 
@@ -518,14 +505,12 @@ async def fetch_all_crate_accounts() -> List[Dict[str, Any]]:
     Raises:
         Exception: If program accounts cannot be fetched or deserialized
     """
-    from solana.rpc.async_api import AsyncClient
-    
     try:
         # Load program for deserialization
         program = await load_program()
-        client = AsyncClient(SOLANA_RPC_URL)
+        client = get_rpc_client()
         
-        print(f"Fetching all accounts for program: {PROGRAM_ID}")
+        logger.debug("Fetching all accounts for program: %s", PROGRAM_ID)
         
         # Get all accounts owned by the program
         # Using get_program_accounts with base64 encoding
@@ -535,7 +520,7 @@ async def fetch_all_crate_accounts() -> List[Dict[str, Any]]:
             commitment="confirmed"
         )
         
-        print(f"Found {len(accounts_response.value)} accounts")
+        logger.debug("Found %s accounts", len(accounts_response.value))
         
         crates = []
         
@@ -553,12 +538,12 @@ async def fetch_all_crate_accounts() -> List[Dict[str, Any]]:
                     # Data is base64 string
                     data_bytes = base64.b64decode(account_data)
                 else:
-                    print(f"Skipping account {pubkey}: unexpected data type")
+                    logger.debug("Skipping account %s: unexpected data type", pubkey)
                     continue
                 
                 # Skip if data is too small (needs at least 8 bytes for discriminator)
                 if len(data_bytes) < 8:
-                    print(f"Skipping account {pubkey}: data too small ({len(data_bytes)} bytes)")
+                    logger.debug("Skipping account %s: data too small (%s bytes)", pubkey, len(data_bytes))
                     continue
                 
                 # Deserialize using Anchor's account decoder
@@ -585,22 +570,17 @@ async def fetch_all_crate_accounts() -> List[Dict[str, Any]]:
                 }
                 
                 crates.append(crate_dict)
-                print(f"✓ Deserialized crate: {crate_dict['crate_id']} ({pubkey[:8]}...)")
+                logger.debug("Deserialized crate: %s (%s...)", crate_dict['crate_id'], pubkey[:8])
                 
             except Exception as e:
-                print(f"Error deserializing account {pubkey}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error deserializing account %s: %s", pubkey, e)
                 continue
         
-        await client.close()
-        print(f"Successfully fetched {len(crates)} crate accounts")
+        logger.debug("Successfully fetched %s crate accounts", len(crates))
         return crates
         
     except Exception as e:
-        print(f"Error fetching crate accounts: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error fetching crate accounts: %s", e)
         raise
 
 
@@ -791,7 +771,7 @@ async def get_all_crates(
     """
     try:
         # Step 1: Fetch all crate accounts from Solana
-        print("Fetching all crate accounts from Solana...")
+        logger.debug("Fetching all crate accounts from Solana...")
         crates = await fetch_all_crate_accounts()
         
         if not crates:
@@ -806,13 +786,13 @@ async def get_all_crates(
                 ),
             )
         
-        print(f"Found {len(crates)} crate accounts")
+        logger.debug("Found %s crate accounts", len(crates))
         
         # Step 2: Build supply chain graph
-        print("Building supply chain graph...")
+        logger.debug("Building supply chain graph...")
         graph = build_supply_chain_graph(crates)
         
-        print(f"✓ Built graph with {graph.total_crates} crates, {len(graph.root_crates)} root crates")
+        logger.debug("Built graph with %s crates, %s root crates", graph.total_crates, len(graph.root_crates))
         
         return GetAllCratesResponse(
             success=True,
@@ -823,9 +803,7 @@ async def get_all_crates(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_all_crates: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_all_crates: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch supply chain data: {str(e)}"
@@ -874,7 +852,7 @@ async def get_crate_history(
     """
     try:
         # Step 1: Fetch all crate accounts from Solana
-        print(f"Fetching crate history for: {crate_pubkey}")
+        logger.debug("Fetching crate history for: %s", crate_pubkey)
         crates = await fetch_all_crate_accounts()
         
         if not crates:
@@ -904,7 +882,7 @@ async def get_crate_history(
         # Get root crate (first in history, or current if it's a root)
         root_crate = history[0] if history else current_crate
         
-        print(f"✓ Found history: {len(history)} crates, depth: {current_crate.depth}")
+        logger.debug("Found history: %s crates, depth: %s", len(history), current_crate.depth)
         
         return CrateHistoryResponse(
             success=True,
@@ -921,62 +899,71 @@ async def get_crate_history(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_crate_history: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_crate_history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch crate history: {str(e)}"
         )
 
 
+def _resolve_ctx(req, user: dict) -> Tuple[int, Optional[str], Optional[str]]:
+    """
+    Resolve the per-request context shared by the crate endpoints.
+    
+    Returns (timestamp, solana_wallet, user_id): the request timestamp or the
+    current time, the wallet from the request body or the user's profile
+    metadata (None if neither has one), and the authenticated user's id.
+    """
+    meta = user.get("user_metadata")
+    solana_wallet = req.solana_wallet or (meta and meta.get("solana_wallet")) or None
+    return req.timestamp or int(time.time()), solana_wallet, user.get("id")
+
+
+async def require_solana_wallet(
+    http_request: Request,
+    current_user: dict = Depends(get_current_user)
+) -> str:
+    """
+    Resolve the authority wallet for a crate request: the request body's
+    `solana_wallet` first, then the user's profile metadata.
+    
+    FastAPI solves dependencies before validating the body model, so requests
+    without any wallet are rejected here without paying for model validation.
+    The raw JSON body is already cached on the request at this point.
+    """
+    try:
+        body = await http_request.json()
+    except ValueError:
+        body = None
+    
+    solana_wallet = body.get("solana_wallet") if isinstance(body, dict) else None
+    if not solana_wallet:
+        user_metadata = current_user.get("user_metadata", {})
+        solana_wallet = user_metadata.get("solana_wallet")
+    
+    if not solana_wallet:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Solana wallet address is required. Please provide it in the request or set it in your user profile."
+        )
+    return solana_wallet
+
+
 @router.post("/create-crate", response_model=CreateCrateResponse, status_code=status.HTTP_200_OK)
 async def create_crate(
     request: CreateCrateRequest,
-    current_user: dict = Depends(get_current_user)
-) -> CreateCrateResponse:
+    current_user: dict = Depends(get_current_user),
+    solana_wallet: str = Depends(require_solana_wallet)
+) -> ORJSONResponse:
     try:
 
-        user_id = current_user.get("id")
+        timestamp, _, user_id = _resolve_ctx(request, current_user)
         user_email = current_user.get("email", "")
         
-        # Validate timestamp or set to current time
-        timestamp = request.timestamp if request.timestamp else int(datetime.utcnow().timestamp())
-        
-        # Additional validation: Check if user has Solana wallet
-        # First check request body, then user metadata
-        solana_wallet = request.solana_wallet
-        if not solana_wallet:
-            user_metadata = current_user.get("user_metadata", {})
-            solana_wallet = user_metadata.get("solana_wallet")
-        
-        if not solana_wallet:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Solana wallet address is required. Please provide it in the request or set it in your user profile."
-            )
-        
-        # # Validate NFC tag exists in database (optional check)
-        # # This could verify the NFC tag is registered in your system
-        # try:
-        #     # Check if NFC tag exists in Supabase (if you have an nfc_tags table)
-        #     # For now, we'll just log it
-        #     print(f"Processing NFC tag: {request.nfc_tag_id} for user: {user_id}")
-        # except Exception as e:
-        #     # If NFC tag validation fails, we can still proceed
-        #     # but log the warning
-        #     print(f"Warning: Could not validate NFC tag: {str(e)}")
-        
-        if request.weight <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Weight must be greater than 0"
-            )
-        
         # Step 4: Build Solana transaction
         try:
             transaction_data = await build_create_crate_transaction(
-                authority_pubkey=solana_wallet,
+                authority=PublicKey.from_string(solana_wallet),
                 crate_id=request.crate_id,
                 crate_did=request.crate_did,
                 owner_did=request.owner_did,
@@ -986,43 +973,19 @@ async def create_crate(
                 timestamp=timestamp,
                 hash_str=request.hash,
                 ipfs_cid=request.ipfs_cid,
+                crate_keypair=take_crate_keypair(),
             )
             
             crate_pubkey = transaction_data["crate_pubkey"]
-            image_url = None
-            offchain_stored = False
-            
-            # Step 5: Upload image to Supabase Storage (if provided)
-            if request.image:
-                print("Uploading image to Supabase Storage...")
-                image_url = await upload_image_to_supabase(request.image, crate_pubkey)
-                if not image_url:
-                    print("Warning: Image upload failed, but continuing with crate creation")
             
-            # Step 6: Store crate data off-chain in Supabase database
-            print("Storing crate data off-chain...")
-            offchain_stored = await store_crate_offchain(
-                crate_pubkey=crate_pubkey,
-                crate_id=request.crate_id,
-                crate_did=request.crate_did,
-                owner_did=request.owner_did,
-                device_did=request.device_did,
-                location=request.location,
-                weight=request.weight,
-                timestamp=timestamp,
-                hash_str=request.hash,
-                ipfs_cid=request.ipfs_cid,
-                user_id=user_id,
-                user_email=user_email,
-                solana_wallet=solana_wallet,
-                image_url=image_url,
-                supply_chain_stage=request.supply_chain_stage
+            # Steps 5-6: Upload the image and store crate data off-chain
+            image_url, offchain_stored = await _store_new_crate(
+                request, crate_pubkey, timestamp, user_id, user_email, solana_wallet
             )
             
-            if not offchain_stored:
-                print("Warning: Off-chain storage failed, but transaction was built successfully")
-            
-            return CreateCrateResponse(
+            # Every field is server-built from already-validated data, so skip
+            # re-validation when constructing the response model
+            response = CreateCrateResponse.model_construct(
                 success=True,
                 message="Crate creation transaction built successfully. Please sign and submit the transaction." + 
                         (" Off-chain data stored." if offchain_stored else ""),
@@ -1036,6 +999,9 @@ async def create_crate(
                 image_url=image_url,
                 offchain_stored=offchain_stored,
             )
+            # Returning the response directly skips FastAPI's response_model
+            # re-validation; response_model stays on the route for the docs
+            return ORJSONResponse(response.model_dump(mode="json", exclude_none=True))
         except FileNotFoundError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1047,7 +1013,7 @@ async def create_crate(
                 detail=f"Invalid Solana wallet address: {str(e)}"
             )
         except Exception as e:
-            print(f"Error building Solana transaction: {str(e)}")
+            logger.error("Error building Solana transaction: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to build Solana transaction: {str(e)}"
@@ -1058,18 +1024,204 @@ async def create_crate(
         raise
     except Exception as e:
         # Log unexpected errors
-        print(f"Error in create_crate: {str(e)}")
+        logger.error("Error in create_crate: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
 
 
+async def _store_new_crate(
+    request: CreateCrateRequest,
+    crate_pubkey: str,
+    timestamp: int,
+    user_id: str,
+    user_email: str,
+    solana_wallet: str,
+) -> Tuple[Optional[str], bool]:
+    """
+    Upload a new crate's image (if provided) to Supabase Storage and store its
+    data off-chain. Returns (image_url, offchain_stored); failures are logged
+    and don't fail the crate creation.
+    """
+    image_url = None
+    if request.image:
+        logger.debug("Uploading image to Supabase Storage...")
+        image_url = await upload_image_to_supabase(request.image, crate_pubkey)
+        if not image_url:
+            logger.warning("Image upload failed, but continuing with crate creation")
+    
+    logger.debug("Storing crate data off-chain...")
+    offchain_stored = await store_crate_offchain(
+        crate_pubkey=crate_pubkey,
+        crate_id=request.crate_id,
+        crate_did=request.crate_did,
+        owner_did=request.owner_did,
+        device_did=request.device_did,
+        location=request.location,
+        weight=request.weight,
+        timestamp=timestamp,
+        hash_str=request.hash,
+        ipfs_cid=request.ipfs_cid,
+        user_id=user_id,
+        user_email=user_email,
+        solana_wallet=solana_wallet,
+        image_url=image_url,
+        supply_chain_stage=request.supply_chain_stage
+    )
+    if not offchain_stored:
+        logger.warning("Off-chain storage failed, but transaction was built successfully")
+    return image_url, offchain_stored
+
+
+@router.post("/create-crates-batch", response_model=CreateCrateBatchResponse, status_code=status.HTTP_200_OK)
+async def create_crates_batch(
+    request: CreateCrateBatchRequest,
+    current_user: dict = Depends(get_current_user),
+    solana_wallet: str = Depends(require_solana_wallet)
+) -> ORJSONResponse:
+    """
+    Build unsigned transactions creating several crates for one authority.
+    
+    create_crate instructions are packed into as few transactions as fit
+    Solana's transaction size limit, so a batch costs fewer signatures, fees
+    and submissions than one /create-crate call per crate. Crate record
+    keypairs come from the pre-generated pool. Each returned transaction must
+    be signed by the authority wallet and the crate keypairs listed with it.
+    """
+    timestamp, _, user_id = _resolve_ctx(request, current_user)
+    user_email = current_user.get("email", "")
+    
+    # The whole batch shares one authority
+    for crate in request.crates:
+        if crate.solana_wallet and crate.solana_wallet != solana_wallet:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Crate {crate.crate_id} names a different solana_wallet than the batch"
+            )
+    
+    timestamps = [crate.timestamp or timestamp for crate in request.crates]
+    crate_keypairs = [take_crate_keypair() for _ in request.crates]
+    try:
+        transactions = await build_create_crate_batch_transaction(
+            authority=PublicKey.from_string(solana_wallet),
+            crates=[
+                {
+                    "crate_id": crate.crate_id,
+                    "crate_did": crate.crate_did,
+                    "owner_did": crate.owner_did,
+                    "device_did": crate.device_did,
+                    "location": crate.location,
+                    "weight": crate.weight,
+                    "timestamp": crate_timestamp,
+                    "hash_str": crate.hash,
+                    "ipfs_cid": crate.ipfs_cid,
+                }
+                for crate, crate_timestamp in zip(request.crates, timestamps)
+            ],
+            crate_keypairs=crate_keypairs,
+        )
+    except ValueError as e:
+        # Invalid wallet address, or a crate too large for one transaction
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid crate batch: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Error building Solana batch transaction: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build Solana transaction: {str(e)}"
+        )
+    
+    offchain_stored = True
+    for crate, crate_timestamp, crate_keypair in zip(request.crates, timestamps, crate_keypairs):
+        _, stored = await _store_new_crate(
+            crate, str(crate_keypair.pubkey()), crate_timestamp, user_id, user_email, solana_wallet
+        )
+        offchain_stored = offchain_stored and stored
+    
+    response = CreateCrateBatchResponse.model_construct(
+        success=True,
+        message=f"Built {len(transactions)} transaction(s) creating {len(request.crates)} crates. Please sign and submit them." +
+                (" Off-chain data stored." if offchain_stored else ""),
+        user_id=user_id,
+        validated=True,
+        transactions=[CrateBatchTransaction.model_construct(**tx) for tx in transactions],
+        offchain_stored=offchain_stored,
+    )
+    return ORJSONResponse(response.model_dump(mode="json", exclude_none=True))
+
+
+def _map_tx_errors(func):
+    """
+    Map errors from building a Solana transaction to HTTP errors: missing
+    program configuration is a 500, invalid addresses are a 400.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except HTTPException:
+            raise
+        except FileNotFoundError as e:
+            # IDL file not found - configuration issue
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Solana program configuration error: {str(e)}. Please ensure the program IDL file exists."
+            )
+        except ValueError as e:
+            # Invalid Solana addresses
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid Solana address: {str(e)}. Please check the wallet address and parent crate public key."
+            )
+        except Exception as e:
+            # Unexpected errors during transaction building
+            logger.error("Error building Solana transfer transaction: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to build Solana transaction: {str(e)}"
+            )
+    return wrapper
+
+
+@_map_tx_errors
+async def _build_transfer(
+    request: TransferOwnershipRequest,
+    authority: Union[str, PublicKey],
+    timestamp: int,
+    builder=build_transfer_ownership_transaction
+) -> Dict[str, Any]:
+    """
+    Build the transfer_ownership transaction shared by both transfer endpoints.
+    `builder` selects the serialized (API) or raw (server-signed) variant.
+    Addresses are parsed here, once, so invalid ones map to a 400; a server
+    keypair's Pubkey can be passed through as-is.
+    """
+    if isinstance(authority, str):
+        authority = PublicKey.from_string(authority)
+    return await builder(
+        authority=authority,
+        parent_crate=PublicKey.from_string(request.parent_crate_pubkey),
+        crate_id=request.crate_id,
+        crate_did=request.crate_did,
+        owner_did=request.owner_did,
+        device_did=request.device_did,
+        location=request.location,
+        weight=request.weight,
+        timestamp=timestamp,
+        hash_str=request.hash,
+        ipfs_cid=request.ipfs_cid,
+        crate_keypair=take_crate_keypair(),
+    )
+
+
 @router.post("/transfer-ownership-unsigned", response_model=TransferOwnershipResponse, status_code=status.HTTP_200_OK)
 async def transfer_ownership_unsigned(
     request: TransferOwnershipRequest,
     current_user: dict = Depends(get_current_user)
-) -> TransferOwnershipResponse:
+) -> ORJSONResponse:
     """
     Transfer ownership of a crate to a new owner.
     
@@ -1102,96 +1254,41 @@ async def transfer_ownership_unsigned(
         HTTPException 500: Transaction building failed
     """
     try:
-        # Step 1: Extract user information
-        user_id = current_user.get("id")
+        # Step 1: Resolve timestamp, Solana wallet (new owner) and user
+        # The wallet comes from the request body first, then user metadata
+        timestamp, solana_wallet, user_id = _resolve_ctx(request, current_user)
         user_email = current_user.get("email", "")
         
-        # Step 2: Validate timestamp or set to current time
-        timestamp = request.timestamp if request.timestamp else int(datetime.utcnow().timestamp())
-        
-        # Step 3: Get Solana wallet address (new owner)
-        # Check request body first, then fall back to user metadata
-        solana_wallet = request.solana_wallet
-        if not solana_wallet:
-            user_metadata = current_user.get("user_metadata", {})
-            solana_wallet = user_metadata.get("solana_wallet")
-        
         if not solana_wallet:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Solana wallet address is required. Please provide it in the request or set it in your user profile."
             )
         
-        # Step 4: Validate weight (basic check - detailed validation happens on-chain)
-        if request.weight <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Weight must be greater than 0"
-            )
-        
-        # Step 5: Validate parent crate public key format
-        if not request.parent_crate_pubkey or len(request.parent_crate_pubkey) < 32:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid parent crate public key. Must be a valid Solana address."
-            )
+        # Step 2: Build Solana transaction for transfer ownership
+        transaction_data = await _build_transfer(request, solana_wallet, timestamp)
         
-        # Step 6: Build Solana transaction for transfer ownership
-        try:
-            transaction_data = await build_transfer_ownership_transaction(
-                authority_pubkey=solana_wallet,
-                parent_crate_pubkey=request.parent_crate_pubkey,
-                crate_id=request.crate_id,
-                crate_did=request.crate_did,
-                owner_did=request.owner_did,
-                device_did=request.device_did,
-                location=request.location,
-                weight=request.weight,
-                timestamp=timestamp,
-                hash_str=request.hash,
-                ipfs_cid=request.ipfs_cid,
-            )
-            
-            # Step 7: Return successful response with transaction data
-            return TransferOwnershipResponse(
-                success=True,
-                message="Transfer ownership transaction built successfully. Please sign with both the authority wallet and crate keypair, then submit to Solana.",
-                crate_id=request.crate_id,
-                user_id=user_id,
-                validated=True,
-                transaction=transaction_data["transaction"],
-                crate_pubkey=transaction_data["crate_pubkey"],
-                crate_keypair=transaction_data["crate_keypair"],
-                parent_crate=transaction_data["parent_crate"],
-                accounts=transaction_data["accounts"],
-            )
-            
-        except FileNotFoundError as e:
-            # IDL file not found - configuration issue
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Solana program configuration error: {str(e)}. Please ensure the program IDL file exists."
-            )
-        except ValueError as e:
-            # Invalid Solana addresses
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid Solana address: {str(e)}. Please check the wallet address and parent crate public key."
-            )
-        except Exception as e:
-            # Unexpected errors during transaction building
-            print(f"Error building Solana transfer transaction: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to build Solana transaction: {str(e)}"
-            )
+        # Step 3: Return successful response with transaction data
+        response = TransferOwnershipResponse.model_construct(
+            success=True,
+            message="Transfer ownership transaction built successfully. Please sign with both the authority wallet and crate keypair, then submit to Solana.",
+            crate_id=request.crate_id,
+            user_id=user_id,
+            validated=True,
+            transaction=transaction_data["transaction"],
+            crate_pubkey=transaction_data["crate_pubkey"],
+            crate_keypair=transaction_data["crate_keypair"],
+            parent_crate=transaction_data["parent_crate"],
+            accounts=transaction_data["accounts"],
+        )
+        return ORJSONResponse(response.model_dump(mode="json", exclude_none=True))
         
     except HTTPException:
         # Re-raise HTTP exceptions (like 400, 401, etc.)
         raise
     except Exception as e:
         # Log unexpected errors
-        print(f"Error in transfer_ownership: {str(e)}")
+        logger.error("Error in transfer_ownership: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
@@ -1202,7 +1299,7 @@ async def transfer_ownership_unsigned(
 async def transfer_ownership(
     request: TransferOwnershipRequest,
     current_user: dict = Depends(get_current_user)
-) -> TransferOwnershipOnChainResponse:
+) -> ORJSONResponse:
     """
     Transfer ownership of a crate - COMPLETE SERVER-SIDE SOLUTION.
     
@@ -1216,95 +1313,74 @@ async def transfer_ownership(
     The transaction is recorded on-chain and can be verified on Solana Explorer.
     """
     try:
-        from solana.rpc.async_api import AsyncClient
-        from solders.keypair import Keypair
-        from solders.transaction import Transaction
-        from solders.pubkey import Pubkey as PublicKey
-        import base64
+        timestamp, _, user_id = _resolve_ctx(request, current_user)
         
-        user_id = current_user.get("id")
-        timestamp = request.timestamp if request.timestamp else int(datetime.utcnow().timestamp())
+        # Shared RPC client for the optional airdrop and the submission below
+        client = get_rpc_client()
         
-        # For server-side signing, generate/use a server-controlled authority keypair
+        # For server-side signing, take a pre-funded server-controlled authority
+        # keypair from the pool; fund a fresh one only if the pool is empty
         # NOTE: In production, load this from secure environment variable or key management service
-        authority_keypair = Keypair()  # Server wallet that will own the crate
+        authority_keypair = take_funded_keypair()  # Server wallet that will own the crate
+        if authority_keypair is None:
+            # Without the pool or a faucet, a fresh wallet could never pay the
+            # fee, so fail before building and submitting a doomed transaction
+            if not airdrops_available():
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="No funded authority available"
+                )
+            needs_airdrop = True
+            authority_keypair = Keypair()
+        else:
+            needs_airdrop = False
         solana_wallet = str(authority_keypair.pubkey())
         
-        print(f"Server authority wallet: {solana_wallet}")
-        
-        # Fund the authority wallet on devnet (only works on devnet/testnet)
-        if "devnet" in SOLANA_RPC_URL or "testnet" in SOLANA_RPC_URL:
-            print("Requesting airdrop for authority wallet...")
-            client_temp = AsyncClient(SOLANA_RPC_URL)
-            try:
-                airdrop_sig = await client_temp.request_airdrop(authority_keypair.pubkey(), 2_000_000_000)  # 2 SOL
-                print(f"Airdrop requested: {airdrop_sig.value}")
-                await client_temp.confirm_transaction(airdrop_sig.value)
-                print("Airdrop confirmed")
-                await client_temp.close()
-            except Exception as e:
-                print(f"Airdrop failed (may already have funds): {e}")
-                await client_temp.close()
-        
-        # Validate inputs
-        if request.weight <= 0:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Weight must be > 0")
-        
-        if not request.parent_crate_pubkey or len(request.parent_crate_pubkey) < 32:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid parent crate pubkey")
+        logger.debug("Server authority wallet: %s", solana_wallet)
         
         # Step 1: Build the transaction
-        print(f"Building transaction for user {user_id}...")
-        transaction_data = await build_transfer_ownership_transaction(
-            authority_pubkey=solana_wallet,
-            parent_crate_pubkey=request.parent_crate_pubkey,
-            crate_id=request.crate_id,
-            crate_did=request.crate_did,
-            owner_did=request.owner_did,
-            device_did=request.device_did,
-            location=request.location,
-            weight=request.weight,
-            timestamp=timestamp,
-            hash_str=request.hash,
-            ipfs_cid=request.ipfs_cid,
+        logger.debug("Building transaction for user %s...", user_id)
+        # Signed in-process, so take the raw Transaction and Keypair objects
+        # rather than round-tripping them through base64
+        build = _build_transfer(
+            request, authority_keypair.pubkey(), timestamp, builder=build_transfer_ownership_raw
         )
+        if needs_airdrop:
+            # Building only needs the authority's address, so overlap it with
+            # funding the fresh wallet instead of waiting for the airdrop first
+            logger.warning("Keypair pool empty, requesting airdrop for authority wallet...")
+            _, transaction_data = await asyncio.gather(
+                fund_keypair(client, authority_keypair), build
+            )
+        else:
+            transaction_data = await build
+        tx = transaction_data["transaction"]
+        crate_keypair = transaction_data["crate_keypair"]
         
-        # Step 2: Deserialize transaction and keypairs
-        print("Deserializing transaction...")
-        tx_bytes = base64.b64decode(transaction_data["transaction"])
-        tx = Transaction.from_bytes(tx_bytes)
-        
-        crate_kp_bytes = base64.b64decode(transaction_data["crate_keypair"])
-        crate_keypair = Keypair.from_bytes(crate_kp_bytes)
-        
-        # Step 3: Sign with both keypairs
-        print("Signing transaction...")
+        # Step 2: Sign with both keypairs
+        logger.debug("Signing transaction...")
         # Both crate_keypair and authority_keypair need to sign
         tx.sign([crate_keypair, authority_keypair], tx.message.recent_blockhash)
         
-        # Step 4: Submit to Solana
-        print("Submitting to Solana...")
-        client = AsyncClient(SOLANA_RPC_URL)
-        
+        # Step 3: Submit to Solana
+        logger.debug("Submitting to Solana...")
         try:
             # Send transaction
             result = await client.send_raw_transaction(bytes(tx))
             signature = str(result.value)
-            print(f"Transaction submitted: {signature}")
+            logger.debug("Transaction submitted: %s", signature)
             
             # Wait for confirmation
-            print("Waiting for confirmation...")
-            confirmation = await client.confirm_transaction(signature)
-            
-            await client.close()
+            logger.debug("Waiting for confirmation...")
+            await confirm_signature(result.value)
             
             # Build explorer URL
             cluster = "devnet" if "devnet" in SOLANA_RPC_URL else "mainnet"
             explorer_url = f"https://explorer.solana.com/tx/{signature}?cluster={cluster}"
             
-            print(f"✓ Transaction confirmed: {signature}")
+            logger.info("Transaction confirmed: %s", signature)
             
-            return TransferOwnershipOnChainResponse(
+            response = TransferOwnershipOnChainResponse.model_construct(
                 success=True,
                 message=f"Transfer ownership completed and recorded on Solana blockchain. Transaction: {signature}",
                 crate_id=request.crate_id,
@@ -1315,10 +1391,10 @@ async def transfer_ownership(
                 explorer_url=explorer_url,
                 accounts=transaction_data["accounts"],
             )
+            return ORJSONResponse(response.model_dump(mode="json", exclude_none=True))
             
         except Exception as e:
-            await client.close()
-            print(f"Blockchain submission failed: {str(e)}")
+            logger.error("Blockchain submission failed: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to submit to blockchain: {str(e)}"
@@ -1327,9 +1403,7 @@ async def transfer_ownership(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in transfer_ownership: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in transfer_ownership: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
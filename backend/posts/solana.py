@@ -1,24 +1,37 @@
-import json
 import os
 import base64
+import logging
 from dataclasses import dataclass
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional
 
-from dotenv import load_dotenv
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey as PublicKey
 from solders.keypair import Keypair
 from solders.transaction import Transaction
+from solders.system_program import ID as SYSTEM_PROGRAM_PUBKEY
 from anchorpy import Program, Provider, Wallet, Idl
 
-load_dotenv()
+# Solana configuration (RPC URL, program ID, .env loading) lives in
+# solana_simple so both builder modules always agree on it
+from posts.solana_simple import (
+    PROGRAM_ID,
+    PROGRAM_ID_STR,
+    SYSTEM_PROGRAM_ID_STR as SYSTEM_PROGRAM_STR,
+    get_recent_blockhash,
+    get_rpc_client,
+)
+
+logger = logging.getLogger(__name__)
 
-# Solana configuration
-SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.devnet.solana.com")
-PROGRAM_ID_STR = os.getenv("PROGRAM_ID", "6WVh9yhUaofmUMAsK1EuCJG5ptzZPzKqj7LcFDVzLgnA")
-PROGRAM_ID = PublicKey.from_string(PROGRAM_ID_STR) if PROGRAM_ID_STR else None
 IDL_PATH = os.getenv("IDL_PATH", "../web3/target/idl/nautilink.json")
 
+# Registry config PDA, derived on first use
+_CONFIG_PDA: Optional[PublicKey] = None
+
+# Parsed program IDL, loaded on first use
+_IDL: Optional[Idl] = None
+
 @dataclass
 class SolanaClient:
     client: AsyncClient
@@ -35,20 +48,24 @@ def create_solana_client():
 
 async def get_config_pda() -> PublicKey:
     # PDA seeds must match what you used in your Seahorse/Anchor program
-    config_pda, _ = PublicKey.find_program_address(
-        [b"registry_config"],
-        PROGRAM_ID,
-    )
-    return config_pda
+    # The seeds are constant, so the bump search only ever runs once
+    global _CONFIG_PDA
+    if _CONFIG_PDA is None:
+        _CONFIG_PDA, _ = PublicKey.find_program_address(
+            [b"registry_config"],
+            PROGRAM_ID,
+        )
+    return _CONFIG_PDA
 
 
-async def get_lot_pda(creator: PublicKey, lot_id: int) -> PublicKey:
+@lru_cache(maxsize=4096)
+def _find_lot_pda(creator_bytes: bytes, lot_id: int) -> PublicKey:
     # lot seeds must match your program's lot.init(seeds=[...])
     # Here we assume seeds=["lot", creator, lot_id]
     lot_pda, _ = PublicKey.find_program_address(
         [
             b"lot",
-            bytes(creator),
+            creator_bytes,
             lot_id.to_bytes(8, byteorder="little"),  # u64
         ],
         PROGRAM_ID,
@@ -56,12 +73,19 @@ async def get_lot_pda(creator: PublicKey, lot_id: int) -> PublicKey:
     return lot_pda
 
 
-async def load_program() -> Program:
-    """Load the Anchor program from IDL file."""
-    if not PROGRAM_ID:
-        raise ValueError("PROGRAM_ID not set in environment variables")
-    
-    client = AsyncClient(SOLANA_RPC_URL)
+async def get_lot_pda(creator: PublicKey, lot_id: int) -> PublicKey:
+    return _find_lot_pda(bytes(creator), lot_id)
+
+
+def load_idl() -> Idl:
+    """
+    Load and parse the program IDL, caching it for the life of the process.
+    The file only changes on `anchor build`, so probing the candidate paths
+    and parsing it once is enough.
+    """
+    global _IDL
+    if _IDL is not None:
+        return _IDL
     
     # Try to find IDL file
     idl_paths = [
@@ -70,26 +94,29 @@ async def load_program() -> Program:
         os.path.join(os.path.dirname(__file__), "..", "..", "web3", "target", "idl", "nautilink.json"),
     ]
     
-    idl_data = None
     for path in idl_paths:
         if path and os.path.exists(path):
             with open(path, "r") as f:
-                idl_data = json.load(f)
-            break
+                # anchorpy parses the raw text; no need to round-trip it through json
+                _IDL = Idl.from_json(f.read())
+            return _IDL
     
-    if not idl_data:
-        raise FileNotFoundError(
-            f"IDL file not found. Tried: {idl_paths}. "
-            "Please build the Anchor program with 'anchor build' or set IDL_PATH environment variable."
-        )
+    raise FileNotFoundError(
+        f"IDL file not found. Tried: {idl_paths}. "
+        "Please build the Anchor program with 'anchor build' or set IDL_PATH environment variable."
+    )
+
+
+async def load_program() -> Program:
+    """Load the Anchor program from IDL file."""
+    idl = load_idl()
     
     # Create dummy wallet for provider (not used for signing)
     dummy_keypair = Keypair()
     dummy_wallet = Wallet(dummy_keypair)
-    provider = Provider(client, dummy_wallet)
+    provider = Provider(get_rpc_client(), dummy_wallet)
     
     # Create program instance
-    idl = Idl.from_json(json.dumps(idl_data))
     program = Program(idl, PROGRAM_ID, provider)
     
     return program
@@ -138,17 +165,16 @@ async def build_create_crate_transaction(
         ).accounts({
             "crate_record": crate_pubkey,
             "authority": authority,
-            "system_program": PublicKey.from_string("11111111111111111111111111111111"),
+            "system_program": SYSTEM_PROGRAM_PUBKEY,
         }).instruction()
         
         # Get recent blockhash
-        client = AsyncClient(SOLANA_RPC_URL)
-        recent_blockhash = await client.get_latest_blockhash()
+        recent_blockhash = await get_recent_blockhash()
         
         # Create transaction
         transaction = Transaction()
         transaction.add(instruction)
-        transaction.recent_blockhash = recent_blockhash.value.blockhash
+        transaction.recent_blockhash = recent_blockhash
         transaction.fee_payer = authority
         
         # Serialize transaction (unsigned)
@@ -167,13 +193,13 @@ async def build_create_crate_transaction(
             "accounts": {
                 "crate_record": str(crate_pubkey),
                 "authority": str(authority),
-                "system_program": "11111111111111111111111111111111",
+                "system_program": SYSTEM_PROGRAM_STR,
             },
-            "program_id": str(PROGRAM_ID),
+            "program_id": PROGRAM_ID_STR,
         }
         
-    except Exception as e:
-        print(f"Error building transaction: {str(e)}")
+    except Exception:
+        logger.exception("Error building transaction")
         raise
 
 
@@ -223,17 +249,16 @@ async def build_transfer_ownership_transaction(
             "crate_record": crate_pubkey,
             "parent_crate": parent_crate,
             "authority": authority,
-            "system_program": PublicKey.from_string("11111111111111111111111111111111"),
+            "system_program": SYSTEM_PROGRAM_PUBKEY,
         }).instruction()
         
         # Get recent blockhash
-        client = AsyncClient(SOLANA_RPC_URL)
-        recent_blockhash = await client.get_latest_blockhash()
+        recent_blockhash = await get_recent_blockhash()
         
         # Create transaction
         transaction = Transaction()
         transaction.add(instruction)
-        transaction.recent_blockhash = recent_blockhash.value.blockhash
+        transaction.recent_blockhash = recent_blockhash
         transaction.fee_payer = authority
         
         # Serialize transaction (unsigned)
@@ -254,12 +279,12 @@ async def build_transfer_ownership_transaction(
                 "crate_record": str(crate_pubkey),
                 "parent_crate": str(parent_crate),
                 "authority": str(authority),
-                "system_program": "11111111111111111111111111111111",
+                "system_program": SYSTEM_PROGRAM_STR,
             },
-            "program_id": str(PROGRAM_ID),
+            "program_id": PROGRAM_ID_STR,
         }
         
-    except Exception as e:
-        print(f"Error building transfer transaction: {str(e)}")
+    except Exception:
+        logger.exception("Error building transfer transaction")
         raise
 
@@ -2,5 +2,6 @@
 Backend services
 """
 from .xai_service import get_xai_service, XAIService
+from .supabase_client import get_supabase_client
 
-__all__ = ['get_xai_service', 'XAIService']
+__all__ = ['get_xai_service', 'XAIService', 'get_supabase_client']
@@ -0,0 +1,28 @@
+"""
+Shared Supabase client for database and storage access.
+"""
+from typing import Optional
+from supabase import create_client, Client, ClientOptions
+
+from config import settings
+
+_supabase_client: Optional[Client] = None
+
+
+def get_supabase_client() -> Client:
+    """
+    Get or create the shared Supabase client.
+    Built once per process so its underlying HTTP connections are reused
+    across requests instead of being set up per caller.
+    """
+    global _supabase_client
+    if _supabase_client is None:
+        _supabase_client = create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_ANON_KEY,
+            options=ClientOptions(
+                postgrest_client_timeout=10,
+                storage_client_timeout=10,
+            ),
+        )
+    return _supabase_client
@@ -4,6 +4,7 @@ Provides AI-powered insights for fleet monitoring, compliance, and anomaly detec
 """
 import os
 import httpx
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 
@@ -385,7 +386,6 @@ class XAIService:
     
     def _get_timestamp(self) -> str:
         """Get current timestamp."""
-        from datetime import datetime
         return datetime.utcnow().isoformat()
 
 
@@ -4,7 +4,10 @@ Provides real blockchain integration for transaction and lot management.
 """
 import os
 import json
+import asyncio
 import base64
+import hashlib
+import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from dotenv import load_dotenv
@@ -22,6 +25,9 @@ SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.devnet.solana.com")
 PROGRAM_ID_STR = os.getenv("PROGRAM_ID", "FHzgesT5QzphL5eucFCjL9KL59TLs3jztw7Qe9RZjHta")
 PROGRAM_ID = PublicKey(PROGRAM_ID_STR)
 
+# Max get_transaction calls in flight while building a crate's history
+HISTORY_FETCH_CONCURRENCY = 10
+
 
 class SolanaService:
     """Service for Solana blockchain operations."""
@@ -154,9 +160,6 @@ class SolanaService:
             # For demo/testing, create mock transaction data
             # In production, this would build and submit a real Solana transaction
             
-            import time
-            import hashlib
-            
             # Generate transaction signature (mock for now)
             tx_content = f"{operation}-{crate_id}-{weight}-{time.time()}"
             signature = hashlib.sha256(tx_content.encode()).hexdigest()[:64]
@@ -228,8 +231,18 @@ class SolanaService:
             
             history = []
             if signatures.value:
-                for sig_info in signatures.value:
-                    tx = await self.get_transaction_by_signature(sig_info.signature)
+                # Fetch the transactions concurrently instead of one round-trip
+                # after another, bounded to stay under RPC rate limits
+                semaphore = asyncio.Semaphore(HISTORY_FETCH_CONCURRENCY)
+                
+                async def fetch(signature):
+                    async with semaphore:
+                        return await self.get_transaction_by_signature(signature)
+                
+                txs = await asyncio.gather(
+                    *(fetch(sig_info.signature) for sig_info in signatures.value)
+                )
+                for tx in txs:
                     if tx:
                         history.append({
                             "timestamp": tx.get("blockTime", datetime.utcnow().isoformat()),
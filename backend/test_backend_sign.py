@@ -3,7 +3,6 @@ Test script where backend signs the transaction
 This tests if our transaction building is correct
 """
 import os
-import json
 import asyncio
 from dotenv import load_dotenv
 from solders.keypair import Keypair
@@ -13,8 +12,12 @@ from solders.transaction import Transaction
 from solders.message import Message as SolanaMessage
 from solders.system_program import ID as SYSTEM_PROGRAM_ID
 from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
 import struct
 
+from posts.solana_simple import anchor_discriminator
+from test_utils import await_signature, close_websocket, load_wallet
+
 load_dotenv()
 
 # Configuration
@@ -23,7 +26,7 @@ PROGRAM_ID_STR = "6WVh9yhUaofmUMAsK1EuCJG5ptzZPzKqj7LcFDVzLgnA"
 PROGRAM_ID = PublicKey.from_string(PROGRAM_ID_STR)
 
 # Instruction discriminators
-CREATE_CRATE_DISCRIMINATOR = bytes([52, 253, 8, 10, 147, 201, 59, 115])
+CREATE_CRATE_DISCRIMINATOR = anchor_discriminator("create_crate")
 
 def serialize_string(s: str) -> bytes:
     """Serialize a string as length-prefixed UTF-8 bytes."""
@@ -31,21 +34,15 @@ def serialize_string(s: str) -> bytes:
     length = len(utf8_bytes)
     return struct.pack('<I', length) + utf8_bytes
 
-def serialize_u64(value: int) -> bytes:
-    """Serialize a u64 as little-endian bytes."""
-    return struct.pack('<Q', value)
+def serialize_u32(value: int) -> bytes:
+    """Serialize a u32 as little-endian bytes."""
+    return struct.pack('<I', value)
 
 def serialize_i64(value: int) -> bytes:
     """Serialize an i64 as little-endian bytes."""
     return struct.pack('<q', value)
 
-def load_wallet():
-    """Load wallet from test_wallet.json"""
-    with open('test_wallet.json', 'r') as f:
-        keypair_data = json.load(f)
-    return Keypair.from_bytes(bytes(keypair_data))
-
-async def test_create_crate_direct():
+async def test_create_crate_direct(client: AsyncClient):
     """Test creating a crate by building and signing transaction ourselves"""
     print("=" * 60)
     print("Nautilink Direct Blockchain Test")
@@ -58,14 +55,12 @@ async def test_create_crate_direct():
     print(f"      [PASS] Wallet: {authority}")
     
     # Check balance
-    client = AsyncClient(SOLANA_RPC)
     balance_resp = await client.get_balance(authority)
     balance = balance_resp.value / 1e9
     print(f"      Balance: {balance} SOL")
     
     if balance < 0.01:
         print("      [FAIL] Insufficient balance!")
-        await client.close()
         return
     
     # Create crate keypair
@@ -82,7 +77,7 @@ async def test_create_crate_direct():
     instruction_data += serialize_string("did:nautilink:owner:test")
     instruction_data += serialize_string("did:nautilink:device:test01")
     instruction_data += serialize_string("40.7128,-74.0060")
-    instruction_data += serialize_u64(1000)
+    instruction_data += serialize_u32(1000)
     instruction_data += serialize_i64(int(asyncio.get_event_loop().time()))
     instruction_data += serialize_string("testhash123")
     instruction_data += serialize_string("QmTestIPFS")
@@ -120,12 +115,7 @@ async def test_create_crate_direct():
         
         # Wait for confirmation
         print("      Waiting for confirmation...")
-        await asyncio.sleep(3)
-        
-        from solders.signature import Signature as SolSignature
-        confirmation = await client.confirm_transaction(SolSignature.from_string(signature))
-        
-        if confirmation.value:
+        if await await_signature(client, result.value):
             print(f"      [PASS] Transaction confirmed!")
             print(f"\n" + "=" * 60)
             print("[PASS] CRATE SUCCESSFULLY CREATED ON DEVNET!")
@@ -139,9 +129,16 @@ async def test_create_crate_direct():
             
     except Exception as e:
         print(f"      [FAIL] Transaction failed: {str(e)}")
-    
-    await client.close()
+
+async def main():
+    """Run the direct test, closing the RPC client and websocket afterwards."""
+    client = AsyncClient(SOLANA_RPC, commitment=Confirmed)
+    try:
+        await test_create_crate_direct(client)
+    finally:
+        await close_websocket()
+        await client.close()
 
 if __name__ == "__main__":
-    asyncio.run(test_create_crate_direct())
+    asyncio.run(main())
 
@@ -7,8 +7,8 @@ Usage:
 """
 import asyncio
 import httpx
-import json
-from datetime import datetime
+import orjson
+import time
 
 # API Configuration
 API_BASE = "http://127.0.0.1:8000"
@@ -26,93 +26,90 @@ CUSTOMER_USER = {
 }
 
 
-async def login(email: str, password: str) -> str:
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
     """Login and get access token."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{API_BASE}/auth/login",
-            json={"email": email, "password": password}
-        )
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("access_token")
-        else:
-            print(f"Login failed: {response.status_code} - {response.text}")
-            return None
+    response = await client.post(
+        f"{API_BASE}/auth/login",
+        content=orjson.dumps({"email": email, "password": password}),
+        headers={"Content-Type": "application/json"},
+    )
+    if response.status_code == 200:
+        # Only the access token is needed from the login response
+        return orjson.loads(response.content).get("access_token")
+    else:
+        print(f"Login failed: {response.status_code} - {response.text}")
+        return None
 
 
-async def test_endpoint_1_get_transactions(token: str):
+async def test_endpoint_1_get_transactions(client: httpx.AsyncClient, token: str):
     """Test Endpoint 1: GET /web3/transactions (mock data)"""
     print("\n" + "="*60)
     print("TEST 1: GET /web3/transactions (Mock Data)")
     print("="*60)
     
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await client.get(f"{WEB3_BASE}/transactions", headers=headers)
-        
-        print(f"Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✓ SUCCESS - Found {len(data.get('transactions', []))} transactions")
-            print(json.dumps(data, indent=2)[:500] + "...")
-        else:
-            print(f"✗ FAILED - {response.text}")
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get(f"{WEB3_BASE}/transactions", headers=headers)
+    
+    print(f"Status Code: {response.status_code}")
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        print(f"✓ SUCCESS - Found {len(data.get('transactions', []))} transactions")
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()[:500] + "...")
+    else:
+        print(f"✗ FAILED - {response.text}")
 
 
-async def test_endpoint_2_get_transaction_details(token: str, signature: str):
+async def test_endpoint_2_get_transaction_details(client: httpx.AsyncClient, token: str, signature: str):
     """Test Endpoint 2: GET /web3/transactions/{signature} (Real Solana)"""
     print("\n" + "="*60)
     print(f"TEST 2: GET /web3/transactions/{signature}")
     print("Real Solana Blockchain Integration")
     print("="*60)
     
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await client.get(
-            f"{WEB3_BASE}/transactions/{signature}",
-            headers=headers
-        )
-        
-        print(f"Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✓ SUCCESS - Transaction found on Solana")
-            print(json.dumps(data, indent=2))
-        elif response.status_code == 404:
-            print(f"✓ EXPECTED - Transaction not found (test with real signature)")
-            print(response.json())
-        else:
-            print(f"✗ FAILED - {response.text}")
-
-
-async def test_endpoint_3_get_lot_info(token: str, crate_id: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get(
+        f"{WEB3_BASE}/transactions/{signature}",
+        headers=headers
+    )
+    
+    print(f"Status Code: {response.status_code}")
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        print(f"✓ SUCCESS - Transaction found on Solana")
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+    elif response.status_code == 404:
+        print(f"✓ EXPECTED - Transaction not found (test with real signature)")
+        print(orjson.loads(response.content))
+    else:
+        print(f"✗ FAILED - {response.text}")
+
+
+async def test_endpoint_3_get_lot_info(client: httpx.AsyncClient, token: str, crate_id: str):
     """Test Endpoint 3: GET /web3/lot/{crate_id} (Real Solana)"""
     print("\n" + "="*60)
     print(f"TEST 3: GET /web3/lot/{crate_id}")
     print("Real Solana Blockchain Integration")
     print("="*60)
     
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await client.get(
-            f"{WEB3_BASE}/lot/{crate_id}",
-            headers=headers
-        )
-        
-        print(f"Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✓ SUCCESS - Lot found on Solana")
-            print(json.dumps(data, indent=2))
-        elif response.status_code == 404:
-            print(f"✓ EXPECTED - Lot not found (test with real crate_id)")
-            print(response.json())
-        else:
-            print(f"✗ FAILED - {response.text}")
-
-
-async def test_endpoint_4_create_transaction(token: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get(
+        f"{WEB3_BASE}/lot/{crate_id}",
+        headers=headers
+    )
+    
+    print(f"Status Code: {response.status_code}")
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        print(f"✓ SUCCESS - Lot found on Solana")
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+    elif response.status_code == 404:
+        print(f"✓ EXPECTED - Lot not found (test with real crate_id)")
+        print(orjson.loads(response.content))
+    else:
+        print(f"✗ FAILED - {response.text}")
+
+
+async def test_endpoint_4_create_transaction(client: httpx.AsyncClient, token: str):
     """Test Endpoint 4: POST /web3/transaction (Real Solana)"""
     print("\n" + "="*60)
     print("TEST 4: POST /web3/transaction")
@@ -121,7 +118,7 @@ async def test_endpoint_4_create_transaction(token: str):
     
     transaction_data = {
         "operation": "CREATE_CRATE",
-        "crate_id": f"TEST_CRATE_{int(datetime.now().timestamp())}",
+        "crate_id": f"TEST_CRATE_{int(time.time())}",
         "weight": 2500,
         "metadata": {
             "species": "Yellowfin Tuna",
@@ -130,25 +127,24 @@ async def test_endpoint_4_create_transaction(token: str):
         }
     }
     
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await client.post(
-            f"{WEB3_BASE}/transaction",
-            headers=headers,
-            params=transaction_data
-        )
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.post(
+        f"{WEB3_BASE}/transaction",
+        headers=headers,
+        params=transaction_data
+    )
+    
+    print(f"Status Code: {response.status_code}")
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        print(f"✓ SUCCESS - Transaction created on Solana")
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
         
-        print(f"Status Code: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✓ SUCCESS - Transaction created on Solana")
-            print(json.dumps(data, indent=2))
-            
-            # Return signature for further testing
-            return data.get("transaction", {}).get("signature")
-        else:
-            print(f"✗ FAILED - {response.text}")
-            return None
+        # Return signature for further testing
+        return data.get("transaction", {}).get("signature")
+    else:
+        print(f"✗ FAILED - {response.text}")
+        return None
 
 
 async def main():
@@ -158,9 +154,16 @@ async def main():
     print("# Testing endpoints 1, 2, 3, 4")
     print("#"*60)
     
+    # One client for every request so connections to the API are reused
+    async with httpx.AsyncClient() as client:
+        await run_tests(client)
+
+
+async def run_tests(client: httpx.AsyncClient):
+    """Run the endpoint tests against the API using a shared client."""
     # Test with Fisher account
     print("\n\n>>> Testing with FISHER account (ethangwang7@gmail.com)")
-    fisher_token = await login(FISHER_USER["email"], FISHER_USER["password"])
+    fisher_token = await login(client, FISHER_USER["email"], FISHER_USER["password"])
     
     if not fisher_token:
         print("✗ Failed to login as Fisher. Aborting tests.")
@@ -169,31 +172,32 @@ async def main():
     print(f"✓ Login successful. Token: {fisher_token[:20]}...")
     
     # Test Endpoint 1 (Mock data - no changes)
-    await test_endpoint_1_get_transactions(fisher_token)
+    await test_endpoint_1_get_transactions(client, fisher_token)
     
     # Test Endpoint 4 (Create transaction - Real Solana)
-    new_signature = await test_endpoint_4_create_transaction(fisher_token)
+    new_signature = await test_endpoint_4_create_transaction(client, fisher_token)
     
     # Test Endpoint 2 with newly created transaction (Real Solana)
     if new_signature:
-        await test_endpoint_2_get_transaction_details(fisher_token, new_signature)
+        await test_endpoint_2_get_transaction_details(client, fisher_token, new_signature)
     else:
         # Test with a sample signature
         await test_endpoint_2_get_transaction_details(
+            client,
             fisher_token,
             "3K8mYzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqzqz"
         )
     
     # Test Endpoint 3 (Get lot info - Real Solana)
-    await test_endpoint_3_get_lot_info(fisher_token, "TUNA_001")
+    await test_endpoint_3_get_lot_info(client, fisher_token, "TUNA_001")
     
     # Test with Customer account
     print("\n\n>>> Testing with CUSTOMER account (tazeemmahashin@gmail.com)")
-    customer_token = await login(CUSTOMER_USER["email"], CUSTOMER_USER["password"])
+    customer_token = await login(client, CUSTOMER_USER["email"], CUSTOMER_USER["password"])
     
     if customer_token:
         print(f"✓ Login successful. Token: {customer_token[:20]}...")
-        await test_endpoint_1_get_transactions(customer_token)
+        await test_endpoint_1_get_transactions(client, customer_token)
     
     print("\n" + "#"*60)
     print("# TESTS COMPLETED")
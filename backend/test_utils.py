@@ -0,0 +1,117 @@
+"""
+Shared helpers for the manual test scripts.
+"""
+import os
+from typing import Optional
+
+import httpx
+import orjson
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import TxOpts
+from solana.rpc.websocket_api import connect as ws_connect
+from solders.keypair import Keypair
+from solders.signature import Signature
+from websockets.exceptions import WebSocketException
+
+from posts.solana_simple import (
+    SOLANA_WS_URL,
+    TransactionFailedError,
+    poll_for_signature,
+    wait_for_signature,
+)
+from token_cache import cached_token, store_token
+
+TEST_WALLET_PATH = "test_wallet.json"
+
+# Poll interval for the fallback when the websocket can't be used
+CONFIRM_POLL_SECONDS = 0.3
+
+# Send options for transactions the API built. Skipping the preflight
+# simulation saves a round-trip, but a failing transaction then still lands
+# on chain, so callers must check the confirmed status's err before
+# reporting success (await_signature does)
+SEND_OPTS = TxOpts(skip_preflight=True, preflight_commitment=Confirmed)
+
+# Test account used by the scripts that log in through Supabase directly
+TEST_EMAIL = "ethangwang7@gmail.com"
+TEST_PASSWORD = "test123"
+
+# RPC websocket shared by every confirmation in a script run, opened on first
+# use and closed with close_websocket()
+_websocket = None
+
+
+def load_wallet(path: str = TEST_WALLET_PATH) -> Keypair:
+    """Load the persistent funded test wallet (see create_test_wallet.py)"""
+    # Solana CLI keypair format: JSON array of the 64 secret key bytes
+    with open(path, 'rb') as f:
+        keypair_data = orjson.loads(f.read())
+    return Keypair.from_bytes(bytes(keypair_data))
+
+
+async def supabase_login(
+    http: httpx.AsyncClient,
+    email: str = TEST_EMAIL,
+    password: str = TEST_PASSWORD,
+) -> Optional[str]:
+    """
+    Get a Supabase access token, reusing the on-disk cached one while it is
+    still valid. Prints the PASS/FAIL line; returns None if the login fails.
+    """
+    token = cached_token(email)
+    if token:
+        print("      [PASS] Reusing cached token")
+        return token
+
+    # Read at call time so scripts can load_dotenv() after importing this
+    response = await http.post(
+        f"{os.getenv('SUPABASE_URL')}/auth/v1/token?grant_type=password",
+        content=orjson.dumps({"email": email, "password": password}),
+        headers={
+            "apikey": os.getenv("SUPABASE_ANON_KEY"),
+            "Content-Type": "application/json"
+        }
+    )
+
+    if response.status_code == 200:
+        token = orjson.loads(response.content)["access_token"]
+        store_token(email, token)
+        print("      [PASS] Authenticated")
+        return token
+    print(f"      [FAIL] Authentication failed: {response.status_code}")
+    return None
+
+
+async def close_websocket() -> None:
+    """Close the shared confirmation websocket, if one was opened."""
+    global _websocket
+    if _websocket is not None:
+        await _websocket.close()
+        _websocket = None
+
+
+async def await_signature(client: AsyncClient, signature: Signature) -> bool:
+    """
+    Wait for a transaction to reach confirmed commitment and return whether it
+    succeeded. Subscribes to the signature over the shared RPC websocket so
+    the node pushes one notification, instead of polling
+    getSignatureStatuses; falls back to polling if the websocket cannot be used.
+    """
+    global _websocket
+    try:
+        try:
+            if _websocket is None:
+                _websocket = await ws_connect(SOLANA_WS_URL)
+            confirmed = await wait_for_signature(_websocket, client, signature)
+        except (OSError, WebSocketException) as e:
+            await close_websocket()
+            print(f"      Websocket unavailable, polling instead: {e}")
+            await poll_for_signature(client, signature, sleep_seconds=CONFIRM_POLL_SECONDS)
+            return True
+    except TransactionFailedError as e:
+        print(f"      {e}")
+        return False
+    if not confirmed:
+        print(f"      Transaction {signature} not confirmed in time")
+    return confirmed
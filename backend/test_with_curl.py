@@ -2,19 +2,20 @@
 Test Nautilink API with Python requests (equivalent to curl)
 Then sign and submit transactions to blockchain
 """
-import os
-import json
+import base64
+import orjson
 import asyncio
-import requests
+import httpx
 from dotenv import load_dotenv
+from test_utils import SEND_OPTS, await_signature, close_websocket, load_wallet, supabase_login
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey as PublicKey
 from solders.instruction import Instruction, AccountMeta
-from solders.transaction import Transaction
+from solders.transaction import Transaction, VersionedTransaction
 from solders.message import Message as SolanaMessage
 from solders.system_program import ID as SYSTEM_PROGRAM_ID
 from solana.rpc.async_api import AsyncClient
-from solders.signature import Signature as SolSignature
+from solana.rpc.commitment import Confirmed
 import struct
 import time
 
@@ -22,41 +23,15 @@ load_dotenv()
 
 # Configuration
 API_URL = "http://localhost:8000"
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 SOLANA_RPC = "https://api.devnet.solana.com"
 PROGRAM_ID_STR = "6WVh9yhUaofmUMAsK1EuCJG5ptzZPzKqj7LcFDVzLgnA"
 
-def load_wallet():
-    """Load wallet from test_wallet.json"""
-    with open('test_wallet.json', 'r') as f:
-        keypair_data = json.load(f)
-    return Keypair.from_bytes(bytes(keypair_data))
-
-def authenticate():
+async def authenticate(http: httpx.AsyncClient):
     """Authenticate with Supabase"""
     print("\n[1/5] Authenticating with Supabase...")
-    response = requests.post(
-        f"{SUPABASE_URL}/auth/v1/token?grant_type=password",
-        json={
-            "email": "ethangwang7@gmail.com",
-            "password": "test123"
-        },
-        headers={
-            "apikey": SUPABASE_KEY,
-            "Content-Type": "application/json"
-        }
-    )
-    
-    if response.status_code == 200:
-        token = response.json()["access_token"]
-        print(f"      [PASS] Authenticated")
-        return token
-    else:
-        print(f"      [FAIL] Authentication failed: {response.status_code}")
-        return None
+    return await supabase_login(http)
 
-def call_create_crate_api(auth_token: str, wallet_pubkey: str):
+async def call_create_crate_api(http: httpx.AsyncClient, auth_token: str, wallet_pubkey: str):
     """Call the create-crate API endpoint"""
     print("\n[2/5] Calling POST /web3/create-crate...")
     
@@ -72,9 +47,9 @@ def call_create_crate_api(auth_token: str, wallet_pubkey: str):
         "solana_wallet": wallet_pubkey
     }
     
-    response = requests.post(
+    response = await http.post(
         f"{API_URL}/web3/create-crate",
-        json=payload,
+        content=orjson.dumps(payload),
         headers={
             "Authorization": f"Bearer {auth_token}",
             "Content-Type": "application/json"
@@ -83,7 +58,7 @@ def call_create_crate_api(auth_token: str, wallet_pubkey: str):
     )
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"      [PASS] API returned transaction")
         print(f"      Crate: {data['crate_pubkey']}")
         return data
@@ -92,11 +67,8 @@ def call_create_crate_api(auth_token: str, wallet_pubkey: str):
         print(f"      {response.text}")
         return None
 
-async def sign_and_submit(tx_base64: str, crate_keypair_b64: str, wallet_keypair: Keypair):
+async def sign_and_submit(client: AsyncClient, tx_base64: str, crate_keypair_b64: str, wallet_keypair: Keypair):
     """Sign and submit a transaction to Solana"""
-    import base64
-    from solders.transaction import VersionedTransaction
-    
     # Decode transaction
     tx_bytes = base64.b64decode(tx_base64)
     
@@ -115,9 +87,8 @@ async def sign_and_submit(tx_base64: str, crate_keypair_b64: str, wallet_keypair
     tx = Transaction([crate_keypair, wallet_keypair], message, message.recent_blockhash)
     
     # Send transaction
-    client = AsyncClient(SOLANA_RPC)
     try:
-        result = await client.send_transaction(tx)
+        result = await client.send_transaction(tx, opts=SEND_OPTS)
         signature = str(result.value)
         
         print(f"      [PASS] Transaction sent!")
@@ -125,19 +96,10 @@ async def sign_and_submit(tx_base64: str, crate_keypair_b64: str, wallet_keypair
         
         # Wait for confirmation
         print(f"      Waiting for confirmation...")
-        await asyncio.sleep(3)
-        
-        confirmation = await client.confirm_transaction(SolSignature.from_string(signature))
-        
-        await client.close()
-        
-        if confirmation.value:
-            return signature, True
-        else:
-            return signature, False
+        confirmed = await await_signature(client, result.value)
+        return signature, confirmed
             
     except Exception as e:
-        await client.close()
         print(f"      [FAIL] Transaction error: {str(e)}")
         return None, False
 
@@ -153,20 +115,36 @@ async def test_full_flow():
     wallet_pubkey = str(wallet.pubkey())
     print(f"      [PASS] Wallet: {wallet_pubkey}")
     
-    # Check balance
-    client = AsyncClient(SOLANA_RPC)
-    balance_resp = await client.get_balance(wallet.pubkey())
-    balance = balance_resp.value / 1e9
-    await client.close()
-    print(f"      Balance: {balance} SOL")
-    
-    # Authenticate
-    token = authenticate()
-    if not token:
-        return
+    # One async client for the Supabase and API calls, so they don't block
+    # the event loop and reuse their connections, and one Solana RPC client
+    # at confirmed commitment
+    solana_client = AsyncClient(SOLANA_RPC, commitment=Confirmed)
+    try:
+        async with httpx.AsyncClient(http2=True) as http:
+            # The balance check and the login are independent, so overlap them
+            balance, token = await asyncio.gather(
+                get_balance(solana_client, wallet.pubkey()),
+                authenticate(http),
+            )
+            print(f"      Balance: {balance} SOL")
+            if not token:
+                return
+            await run_api_flow(http, solana_client, token, wallet)
+    finally:
+        await close_websocket()
+        await solana_client.close()
+
+async def get_balance(client: AsyncClient, pubkey: PublicKey) -> float:
+    """Get a wallet's balance in SOL"""
+    balance_resp = await client.get_balance(pubkey)
+    return balance_resp.value / 1e9
+
+async def run_api_flow(http: httpx.AsyncClient, solana_client: AsyncClient, token: str, wallet: Keypair):
+    """Build a crate via the API, then sign and submit it"""
+    wallet_pubkey = str(wallet.pubkey())
     
     # Call API
-    create_data = call_create_crate_api(token, wallet_pubkey)
+    create_data = await call_create_crate_api(http, token, wallet_pubkey)
     if not create_data:
         return
     
@@ -177,7 +155,7 @@ async def test_full_flow():
     crate_pubkey = create_data["crate_pubkey"]
     
     print("\n[4/5] Submitting to Solana devnet...")
-    signature, confirmed = await sign_and_submit(tx_base64, crate_keypair_b64, wallet)
+    signature, confirmed = await sign_and_submit(solana_client, tx_base64, crate_keypair_b64, wallet)
     
     if signature and confirmed:
         print(f"      [PASS] Transaction confirmed!")
@@ -189,11 +167,11 @@ async def test_full_flow():
         print(f"Account: https://explorer.solana.com/address/{crate_pubkey}?cluster=devnet")
         
         # Test transfer ownership
-        await test_transfer_ownership(token, wallet, crate_pubkey)
+        await test_transfer_ownership(http, solana_client, token, wallet, crate_pubkey)
     else:
         print("\n[FAIL] Transaction not confirmed")
 
-async def test_transfer_ownership(auth_token: str, wallet: Keypair, parent_crate: str):
+async def test_transfer_ownership(http: httpx.AsyncClient, solana_client: AsyncClient, auth_token: str, wallet: Keypair, parent_crate: str):
     """Test transfer ownership endpoint"""
     print("\n" + "=" * 60)
     print("Testing Transfer Ownership")
@@ -214,9 +192,9 @@ async def test_transfer_ownership(auth_token: str, wallet: Keypair, parent_crate
         "solana_wallet": str(wallet.pubkey())
     }
     
-    response = requests.post(
+    response = await http.post(
         f"{API_URL}/web3/transfer-ownership-unsigned",
-        json=payload,
+        content=orjson.dumps(payload),
         headers={
             "Authorization": f"Bearer {auth_token}",
             "Content-Type": "application/json"
@@ -225,13 +203,14 @@ async def test_transfer_ownership(auth_token: str, wallet: Keypair, parent_crate
     )
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"      [PASS] API returned transaction")
         print(f"      Child Crate: {data['crate_pubkey']}")
         
         # Sign and submit
         print("\n      Signing and submitting transfer transaction...")
         signature, confirmed = await sign_and_submit(
+            solana_client,
             data["transaction"],
             data["crate_keypair"],
             wallet
@@ -1,14 +1,15 @@
 """
 Simple working test to submit transactions to Solana devnet
 """
-import os
-import json
+import orjson
 import base64
 import asyncio
-import requests
+import httpx
 from dotenv import load_dotenv
+from test_utils import SEND_OPTS, await_signature, close_websocket, load_wallet, supabase_login
 from solders.keypair import Keypair
 from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
 from solders.transaction import VersionedTransaction
 
 load_dotenv()
@@ -16,39 +17,14 @@ load_dotenv()
 # Configuration
 API_BASE_URL = "http://localhost:8000"
 SOLANA_RPC = "https://api.devnet.solana.com"
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
-def load_wallet():
-    """Load wallet from test_wallet.json"""
-    with open('test_wallet.json', 'r') as f:
-        keypair_data = json.load(f)
-    return Keypair.from_bytes(bytes(keypair_data))
 
-def authenticate():
+async def authenticate(http: httpx.AsyncClient):
     """Authenticate with Supabase"""
     print("\n[1/4] Authenticating...")
-    response = requests.post(
-        f"{SUPABASE_URL}/auth/v1/token?grant_type=password",
-        json={
-            "email": "ethangwang7@gmail.com",
-            "password": "test123"
-        },
-        headers={
-            "apikey": SUPABASE_KEY,
-            "Content-Type": "application/json"
-        }
-    )
-    
-    if response.status_code == 200:
-        token = response.json()["access_token"]
-        print("      [PASS] Authenticated successfully")
-        return token
-    else:
-        print(f"      [FAIL] Authentication failed: {response.status_code}")
-        return None
+    return await supabase_login(http)
 
-async def sign_and_send_transaction(tx_base64: str, crate_keypair_b64: str, wallet_keypair: Keypair):
+async def sign_and_send_transaction(client: AsyncClient, tx_base64: str, crate_keypair_b64: str, wallet_keypair: Keypair):
     """Sign and send a transaction to Solana"""
     # Decode transaction
     tx_bytes = base64.b64decode(tx_base64)
@@ -67,22 +43,15 @@ async def sign_and_send_transaction(tx_base64: str, crate_keypair_b64: str, wall
     signed_tx = VersionedTransaction.populate(tx.message, [sig1, sig2])
     
     # Send transaction
-    client = AsyncClient(SOLANA_RPC)
-    try:
-        result = await client.send_transaction(signed_tx)
-        signature = str(result.value)
-        
-        # Wait for confirmation
-        await asyncio.sleep(3)
-        confirmation = await client.confirm_transaction(signature)
-        
-        await client.close()
-        return signature, confirmation.value
-    except Exception as e:
-        await client.close()
-        raise e
+    result = await client.send_transaction(signed_tx, opts=SEND_OPTS)
+    signature = str(result.value)
+    
+    # Wait for confirmation
+    confirmed = await await_signature(client, result.value)
+    
+    return signature, confirmed
 
-async def test_create_crate(auth_token: str, wallet_keypair: Keypair):
+async def test_create_crate(http: httpx.AsyncClient, solana_client: AsyncClient, auth_token: str, wallet_keypair: Keypair):
     """Test creating a crate"""
     print("\n[2/4] Building create crate transaction...")
     
@@ -98,9 +67,9 @@ async def test_create_crate(auth_token: str, wallet_keypair: Keypair):
         "solana_wallet": str(wallet_keypair.pubkey())
     }
     
-    response = requests.post(
+    response = await http.post(
         f"{API_BASE_URL}/web3/create-crate",
-        json=payload,
+        content=orjson.dumps(payload),
         headers={
             "Authorization": f"Bearer {auth_token}",
             "Content-Type": "application/json"
@@ -113,7 +82,7 @@ async def test_create_crate(auth_token: str, wallet_keypair: Keypair):
         print(f"        {response.text}")
         return None
     
-    data = response.json()
+    data = orjson.loads(response.content)
     tx_base64 = data["transaction"]
     crate_keypair_b64 = data["crate_keypair"]
     crate_pubkey = data["crate_pubkey"]
@@ -123,7 +92,7 @@ async def test_create_crate(auth_token: str, wallet_keypair: Keypair):
     
     print("\n[3/4] Signing and submitting transaction...")
     try:
-        signature, confirmed = await sign_and_send_transaction(tx_base64, crate_keypair_b64, wallet_keypair)
+        signature, confirmed = await sign_and_send_transaction(solana_client, tx_base64, crate_keypair_b64, wallet_keypair)
         
         if confirmed:
             print(f"      [PASS] Transaction confirmed!")
@@ -150,14 +119,23 @@ async def main():
     wallet = load_wallet()
     print(f"      [PASS] Wallet loaded: {wallet.pubkey()}")
     
-    # Authenticate
-    token = authenticate()
-    if not token:
-        print("\n[FAIL] Test failed: Authentication error")
-        return
-    
-    # Test create crate
-    crate_pubkey = await test_create_crate(token, wallet)
+    # One async client for the Supabase and API calls, so they don't block
+    # the event loop and reuse their connections, and one Solana RPC client
+    # at confirmed commitment
+    solana_client = AsyncClient(SOLANA_RPC, commitment=Confirmed)
+    try:
+        async with httpx.AsyncClient(http2=True) as http:
+            # Authenticate
+            token = await authenticate(http)
+            if not token:
+                print("\n[FAIL] Test failed: Authentication error")
+                return
+            
+            # Test create crate
+            crate_pubkey = await test_create_crate(http, solana_client, token, wallet)
+    finally:
+        await close_websocket()
+        await solana_client.close()
     
     if crate_pubkey:
         print("\n" + "=" * 60)
@@ -6,9 +6,12 @@ import requests
 
 BASE_URL = "http://localhost:8000"
 
+# One session for every call so they share a keep-alive connection
+api_session = requests.Session()
+
 # Test Signup
 print("1. Testing Signup...")
-response = requests.post(f"{BASE_URL}/auth/signup", json={
+response = api_session.post(f"{BASE_URL}/auth/signup", json={
     "email": "test@example.com",
     "password": "test123456"
 })
@@ -20,7 +23,7 @@ token = response.json().get("access_token") if response.status_code == 201 else
 
 # Test Login
 print("2. Testing Login...")
-response = requests.post(f"{BASE_URL}/auth/login", json={
+response = api_session.post(f"{BASE_URL}/auth/login", json={
     "email": "test@example.com",
     "password": "test123456"
 })
@@ -34,7 +37,7 @@ token = response.json().get("access_token") if response.status_code == 200 else
 if token:
     print("3. Testing Get Current User...")
     headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/auth/me", headers=headers)
+    response = api_session.get(f"{BASE_URL}/auth/me", headers=headers)
     print(f"Status: {response.status_code}")
     print(f"Response: {response.json()}\n")
 
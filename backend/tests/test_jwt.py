@@ -8,9 +8,12 @@ import sys
 
 BASE_URL = "http://localhost:8000"
 
+# One session for every call so they share a keep-alive connection
+api_session = requests.Session()
+
 def login(email: str, password: str):
     """Login and get JWT token."""
-    response = requests.post(
+    response = api_session.post(
         f"{BASE_URL}/auth/login",
         json={"email": email, "password": password}
     )
@@ -27,7 +30,7 @@ def login(email: str, password: str):
 
 def signup(email: str, password: str, user_type: str = "fisherman"):
     """Sign up a new user and get JWT token."""
-    response = requests.post(
+    response = api_session.post(
         f"{BASE_URL}/auth/signup",
         json={
             "email": email,
@@ -49,7 +52,7 @@ def signup(email: str, password: str, user_type: str = "fisherman"):
 
 def test_create_crate(token: str):
     """Test the create-crate endpoint."""
-    response = requests.post(
+    response = api_session.post(
         f"{BASE_URL}/web3/create-crate",
         headers={
             "Authorization": f"Bearer {token}",
@@ -0,0 +1,49 @@
+"""
+On-disk cache of Supabase access tokens for the manual test scripts.
+
+A Supabase JWT stays valid for an hour, so scripts run back-to-back reuse the
+cached token instead of doing a fresh password login each time.
+"""
+import os
+import time
+from typing import Optional
+
+import jwt
+import orjson
+
+TOKEN_CACHE_PATH = os.path.expanduser(os.getenv("NAUTILINK_TOKEN_CACHE", "~/.nautilink_token"))
+
+# Treat tokens this close to expiry as expired so they don't lapse mid-run
+EXPIRY_MARGIN_SECONDS = 60
+
+
+def _read_cache() -> dict:
+    try:
+        with open(TOKEN_CACHE_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def cached_token(email: str) -> Optional[str]:
+    """Return the cached access token for email if it has not expired."""
+    token = _read_cache().get(email)
+    if not token:
+        return None
+    try:
+        # Only the expiry is needed here; the backend verifies the signature
+        exp = jwt.decode(token, options={"verify_signature": False})["exp"]
+    except (jwt.InvalidTokenError, KeyError):
+        return None
+    if exp - EXPIRY_MARGIN_SECONDS <= time.time():
+        return None
+    return token
+
+
+def store_token(email: str, token: str) -> None:
+    """Cache the access token for email, readable only by the current user."""
+    cache = _read_cache()
+    cache[email] = token
+    fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps(cache))